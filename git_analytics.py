@@ -0,0 +1,201 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from git_search import parse_commit_type, strip_commit_type
+from git_trace import traced
+from git_utils import commit_types, get_session, iter_log_batches
+
+# 분석용 git log 형식: sha, 커밋 시각(epoch), 작성자, 메시지
+# (create_commit_message 형식은 빈 줄 없이 이어지므로 %s 대신 %B의 첫 줄을 제목으로 쓴다)
+_ANALYTICS_FORMAT = '%H%x00%ct%x00%an%x00%B'
+_ANALYTICS_FIELDS = 4
+_ANALYTICS_READ_SIZE = 4 << 20
+
+# 타입이 없는 커밋의 분류 이름
+UNTYPED = 'other'
+
+# 주 단위 집계 (1970-01-01은 목요일이므로 월요일 시작으로 맞춘다)
+SECONDS_PER_WEEK = 7 * 24 * 3600
+_WEEK_OFFSET = 3 * 24 * 3600
+
+# 변경 로그에 타입별로 나열할 최대 커밋 수
+CHANGELOG_MAX_ENTRIES = 200
+
+
+class CommitColumns:
+    """커밋 메타데이터를 열 단위 배열로 담은 테이블 (최신순)
+
+    타입과 작성자는 type_names/author_names의 인덱스로 정수 코드화하고,
+    제목 줄은 하나의 바이트 묶음과 오프셋 배열로 저장하여 커밋마다 객체를 만들지 않는다.
+    """
+
+    def __init__(self, shas, timestamps, type_codes, author_codes, type_names, author_names,
+                 subjects, subject_offsets):
+        self.shas = shas                      # S40
+        self.timestamps = timestamps          # int64, epoch 초
+        self.type_codes = type_codes          # int16
+        self.author_codes = author_codes      # int32
+        self.type_names = type_names
+        self.author_names = author_names
+        self.subjects = subjects              # UTF-8 제목 줄을 이어 붙인 bytes
+        self.subject_offsets = subject_offsets  # int64, 길이 n+1
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self):
+        """열 데이터가 차지하는 메모리 크기"""
+        arrays = (self.shas, self.timestamps, self.type_codes, self.author_codes, self.subject_offsets)
+        return sum(a.nbytes for a in arrays) + len(self.subjects)
+
+    def subject(self, i):
+        start, end = self.subject_offsets[i], self.subject_offsets[i + 1]
+        return self.subjects[start:end].decode('utf-8', 'replace')
+
+
+class _ColumnBuilder:
+    """git log 출력 묶음을 받아 열 배열을 쌓는다"""
+
+    def __init__(self):
+        self.type_names = list(commit_types) + [UNTYPED]
+        self.type_index = {name: code for code, name in enumerate(self.type_names)}
+        self.author_names = []
+        self.author_index = {}
+        self.chunks = []
+
+    def _code(self, names, index, name):
+        code = index.get(name)
+        if code is None:
+            code = index[name] = len(names)
+            names.append(name)
+        return code
+
+    def add_batch(self, tokens):
+        shas = np.array(tokens[0::_ANALYTICS_FIELDS], dtype='S40')
+        timestamps = np.array(tokens[1::_ANALYTICS_FIELDS]).astype(np.int64)
+
+        # 작성자는 묶음 안의 고유 이름만 디코딩하여 전체 코드로 변환
+        unique_authors, author_inverse = np.unique(
+            np.array(tokens[2::_ANALYTICS_FIELDS], dtype=object), return_inverse=True
+        )
+        author_lookup = np.array(
+            [self._code(self.author_names, self.author_index, a.decode('utf-8', 'replace'))
+             for a in unique_authors],
+            dtype=np.int32
+        )
+
+        subjects = [message.partition(b'\n')[0] for message in tokens[3::_ANALYTICS_FIELDS]]
+        type_lookup = {}
+        type_codes = np.empty(len(subjects), dtype=np.int16)
+        for i, subject in enumerate(subjects):
+            # 타입 접두어는 제목 앞부분에만 있으므로 앞부분으로 결과를 재사용
+            prefix = subject[:subject.find(b':') + 1] if b':' in subject else b''
+            code = type_lookup.get(prefix)
+            if code is None:
+                name = parse_commit_type(prefix.decode('utf-8', 'replace')) or UNTYPED
+                code = type_lookup[prefix] = self._code(self.type_names, self.type_index, name)
+            type_codes[i] = code
+
+        lengths = np.fromiter(map(len, subjects), dtype=np.int64, count=len(subjects))
+        self.chunks.append((shas, timestamps, type_codes, author_lookup[author_inverse.ravel()],
+                            b''.join(subjects), lengths))
+
+    def build(self):
+        if not self.chunks:
+            empty = np.empty(0, dtype=np.int64)
+            return CommitColumns(np.empty(0, dtype='S40'), empty, empty.astype(np.int16),
+                                 empty.astype(np.int32), self.type_names, self.author_names,
+                                 b'', np.zeros(1, dtype=np.int64))
+        shas, timestamps, type_codes, author_codes, subjects, lengths = zip(*self.chunks)
+        offsets = np.zeros(sum(len(l) for l in lengths) + 1, dtype=np.int64)
+        np.cumsum(np.concatenate(lengths), out=offsets[1:])
+        return CommitColumns(
+            np.concatenate(shas), np.concatenate(timestamps), np.concatenate(type_codes),
+            np.concatenate(author_codes), self.type_names, self.author_names,
+            b''.join(subjects), offsets
+        )
+
+
+@traced(count=len)
+def load_commit_columns(revision_range='HEAD', include_merges=False):
+    """리비전 범위(예: 'v1.0..v2.0', 'main')의 커밋을 열 배열로 읽음
+
+    git log 한 번의 스트리밍 출력을 묶음 단위로 배열화하므로 커밋 수가 많아도
+    커밋별 딕셔너리를 만들지 않는다.
+    """
+    args = [f'--format={_ANALYTICS_FORMAT}']
+    if not include_merges:
+        args.append('--no-merges')
+
+    # 리비전은 stdin으로 넘기고 --all 등 허용된 옵션 외에는 ValueError로 거부한다
+    builder = _ColumnBuilder()
+    revs = revision_range.split() or ['HEAD']
+    for tokens in iter_log_batches(get_session(), args, _ANALYTICS_FIELDS, revs, decode=False,
+                                   read_size=_ANALYTICS_READ_SIZE):
+        builder.add_batch(tokens)
+    return builder.build()
+
+
+def count_by_type(columns):
+    """타입별 커밋 수 {타입: 개수} (commit_types 순서, 0개인 타입 제외)"""
+    counts = np.bincount(columns.type_codes, minlength=len(columns.type_names))
+    return {name: int(count) for name, count in zip(columns.type_names, counts) if count}
+
+
+def count_by_author(columns, limit=None):
+    """작성자별 커밋 수를 많은 순으로 [(작성자, 개수)] 반환"""
+    counts = np.bincount(columns.author_codes, minlength=len(columns.author_names))
+    order = np.argsort(-counts, kind='stable')[:limit]
+    return [(columns.author_names[i], int(counts[i])) for i in order if counts[i]]
+
+
+def weekly_throughput(columns):
+    """주별, 타입별 커밋 수를 집계
+
+    (주 시작일 문자열 목록, 타입 이름 목록, [주 x 타입] 개수 배열)을 반환한다.
+    커밋이 없는 주도 0으로 포함되고, 커밋이 하나도 없는 타입은 제외된다.
+    """
+    if not len(columns):
+        return [], [], np.zeros((0, 0), dtype=np.int64)
+    weeks = (columns.timestamps + _WEEK_OFFSET) // SECONDS_PER_WEEK
+    first_week = weeks.min()
+    week_count = int(weeks.max() - first_week) + 1
+    type_count = len(columns.type_names)
+
+    flat = (weeks - first_week) * type_count + columns.type_codes
+    matrix = np.bincount(flat, minlength=week_count * type_count).reshape(week_count, type_count)
+    used = np.flatnonzero(matrix.sum(axis=0))
+
+    week_starts = [
+        datetime.fromtimestamp(int(week) * SECONDS_PER_WEEK - _WEEK_OFFSET, timezone.utc).strftime('%Y-%m-%d')
+        for week in range(int(first_week), int(first_week) + week_count)
+    ]
+    return week_starts, [columns.type_names[i] for i in used], matrix[:, used]
+
+
+def generate_changelog(columns, title='Changelog', max_entries=CHANGELOG_MAX_ENTRIES):
+    """커밋 타입별로 묶은 Markdown 변경 로그를 생성 (타입 안에서는 최신순)"""
+    lines = [f"# {title}", ""]
+    if not len(columns):
+        lines.append("_No commits in this range._")
+        return '\n'.join(lines)
+
+    start = datetime.fromtimestamp(int(columns.timestamps.min()), timezone.utc).strftime('%Y-%m-%d')
+    end = datetime.fromtimestamp(int(columns.timestamps.max()), timezone.utc).strftime('%Y-%m-%d')
+    lines += [f"{len(columns)} commits by {len(np.unique(columns.author_codes))} authors ({start} ~ {end})", ""]
+
+    for code, name in enumerate(columns.type_names):
+        indices = np.flatnonzero(columns.type_codes == code)
+        if not len(indices):
+            continue
+        lines.append(f"## {name} ({len(indices)})")
+        for i in indices[:max_entries]:
+            subject = strip_commit_type(columns.subject(i))
+            sha = columns.shas[i][:7].decode()
+            lines.append(f"- {subject} ({sha}, {columns.author_names[columns.author_codes[i]]})")
+        if len(indices) > max_entries:
+            lines.append(f"- _... and {len(indices) - max_entries} more_")
+        lines.append("")
+    return '\n'.join(lines)
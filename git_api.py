@@ -0,0 +1,367 @@
+"""commit-frame JSON HTTP API
+
+Streamlit 없이 git_utils 작업과 커밋/그래프 데이터를 JSON으로 제공하는 Flask 서버.
+참조 상태에 의존하는 GET 응답은 HEAD와 참조 끝의 해시를 ETag로 달아, 리포지토리가
+바뀌기 전까지 If-None-Match 요청에 304로 응답한다. 긴 목록은 NDJSON으로 스트리밍한다.
+
+    python git_api.py --repo /path/to/repo --port 5000
+    curl -i http://127.0.0.1:5000/api/commits?limit=100
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+
+import git
+from flask import Flask, Response, jsonify, make_response, request
+
+from git_search import DEFAULT_SEARCH_LIMIT, search_commits
+from git_utils import (
+    GRAPH_SOURCES,
+    HISTORY_PAGE_SIZE,
+    MAX_DECORATED_TAGS,
+    REF_TYPE_PREFIXES,
+    commit_types,
+    create_commit_message,
+    execute_checkout,
+    execute_commit,
+    execute_create_branch,
+    execute_create_branches,
+    execute_merge,
+    execute_pull,
+    execute_push,
+    fetch_manager,
+    get_branch_status_overview,
+    get_commit_history,
+    get_current_repo_path,
+    get_git_graph_page,
+    get_graph_page_source,
+    get_ref_state,
+    get_working_tree_status,
+    iter_commit_records,
+    list_refs,
+    preview_merges,
+    set_repo_path,
+    split_revisions
+)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# NDJSON 스트림에서 한 번에 내보내는 줄 수 (줄마다 쓰면 WSGI 왕복 비용이 커진다)
+NDJSON_BATCH_LINES = 500
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+
+# 작업 실패(execute_*가 메시지를 반환한 경우)의 상태 코드
+OPERATION_FAILED_STATUS = 409
+
+
+class ApiError(Exception):
+    """요청을 처리할 수 없을 때 JSON 오류 응답으로 변환되는 예외"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def ref_state_etag(view):
+    """응답에 참조 상태 해시를 ETag로 달고, If-None-Match가 같으면 뷰를 실행하지 않고 304를 반환"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = get_ref_state()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # 매번 ETag로 재검증
+        return response
+    return wrapper
+
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+
+def ndjson_response(items):
+    """항목을 한 줄에 하나씩 JSON으로 스트리밍하는 응답
+
+    첫 항목은 응답을 시작하기 전에 읽어, git 오류(잘못된 리비전 등)가 스트림 중간이 아닌
+    오류 응답으로 드러나게 한다.
+    """
+    items = iter(items)
+    first = next(items, None)
+
+    def generate():
+        if first is None:
+            return
+        encode = _json_encoder.encode
+        lines = [encode(first)]
+        for item in items:
+            lines.append(encode(item))
+            if len(lines) >= NDJSON_BATCH_LINES:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+
+def _commit_to_json(record):
+    """캐시 레코드를 API 응답용 딕셔너리로 변환"""
+    sha, parents, title, body, author, date, timestamp = record[:7]
+    return {
+        'sha': sha,
+        'short_sha': sha[:7],
+        'message': title,
+        'body': body,
+        'author': author,
+        'date': date,
+        'timestamp': timestamp,
+        'parents': parents
+    }
+
+
+def _int_arg(name, default=None, minimum=0):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(f"'{name}' must be an integer.")
+    if value < minimum:
+        raise ApiError(f"'{name}' must be at least {minimum}.")
+    return value
+
+
+def _list_arg(name):
+    """?name=a&name=b 또는 ?name=a,b 형태의 목록 인자"""
+    return [v.strip() for value in request.args.getlist(name) for v in value.split(',') if v.strip()]
+
+
+def _json_body(*required):
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ApiError("Request body must be a JSON object.")
+    missing = [key for key in required if not body.get(key)]
+    if missing:
+        raise ApiError(f"Missing required fields: {', '.join(missing)}.")
+    invalid = [key for key in required if not isinstance(body[key], str)]
+    if invalid:
+        raise ApiError(f"Fields must be strings: {', '.join(invalid)}.")
+    return body
+
+
+def _string_list(body, name):
+    """본문의 name 필드가 문자열 목록인지 확인하여 반환 (문자열 하나는 글자 단위로 순회되므로 거부)"""
+    value = body[name]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ApiError(f"'{name}' must be a list of strings.")
+    return value
+
+
+def _operation_result(error):
+    """execute_* 반환값(성공 시 None, 실패 시 메시지)을 응답으로 변환"""
+    if error:
+        return jsonify({'ok': False, 'message': error}), OPERATION_FAILED_STATUS
+    return jsonify({'ok': True, 'ref_state': get_ref_state()})
+
+
+def create_app(path=None):
+    """API 애플리케이션을 생성. path가 주어지면 작업 대상 리포지토리로 설정"""
+    if path is not None:
+        set_repo_path(os.path.abspath(path))
+
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+    app.json.sort_keys = False
+
+    @app.errorhandler(ApiError)
+    def handle_api_error(e):
+        return jsonify({'message': e.message}), e.status
+
+    @app.errorhandler(git.exc.GitCommandError)
+    def handle_git_error(e):
+        stderr = e.stderr.decode('utf-8', 'replace') if isinstance(e.stderr, bytes) else e.stderr
+        # GitPython은 stderr를 "\n  stderr: '<내용>'" 형태로 감싼다
+        message = (stderr or str(e)).strip().removeprefix("stderr: '").removesuffix("'").strip()
+        return jsonify({'message': message}), 400
+
+    @app.errorhandler(git.exc.InvalidGitRepositoryError)
+    @app.errorhandler(git.exc.NoSuchPathError)
+    def handle_repository_error(e):
+        return jsonify({'message': "Not a Git repository. Please check if the path is correct."}), 500
+
+    @app.get('/api/health')
+    def health():
+        return jsonify({'repository': get_current_repo_path(), 'commit_types': commit_types})
+
+    @app.get('/api/state')
+    def state():
+        """폴링용 참조 상태 해시"""
+        return jsonify({'ref_state': get_ref_state()})
+
+    @app.get('/api/refs')
+    @ref_state_etag
+    def refs():
+        """참조 목록 (NDJSON). ?type=branch,remote,tag&include=<glob>&exclude=<glob>&max_tags=N"""
+        ref_types = _list_arg('type') or None
+        unknown = set(ref_types or ()) - set(REF_TYPE_PREFIXES)
+        if unknown:
+            raise ApiError(f"Unknown reference types: {', '.join(sorted(unknown))}.")
+        return ndjson_response(list_refs(
+            ref_types, _list_arg('include'), _list_arg('exclude'), _int_arg('max_tags', MAX_DECORATED_TAGS)
+        ))
+
+    @app.get('/api/branches')
+    @ref_state_etag
+    def branches():
+        """로컬 브랜치와 upstream 대비 ahead/behind"""
+        return jsonify(get_branch_status_overview())
+
+    @app.get('/api/commits')
+    @ref_state_etag
+    def commits():
+        """커밋 목록 (NDJSON, 최신순). ?rev=<리비전>&skip=N&limit=N
+
+        rev가 없으면 모든 참조의 커밋을 커밋 그래프 캐시에서 읽고, 있으면 git log로 스트리밍한다.
+        rev로 받는 옵션은 --all, --branches 등 REVISION_OPTIONS에 있는 것만 허용한다.
+        """
+        skip = _int_arg('skip', 0)
+        limit = _int_arg('limit')
+        revs = request.args.getlist('rev')
+        if revs:
+            try:
+                split_revisions(revs)
+            except ValueError as e:
+                raise ApiError(str(e))
+            records = iter_commit_records(revs, skip=skip, max_count=limit)
+        else:
+            records = get_commit_history()[1]
+            records = records[skip:] if limit is None else records[skip:skip + limit]
+        return ndjson_response(map(_commit_to_json, records))
+
+    @app.get('/api/graph')
+    @ref_state_etag
+    def graph():
+        """Git History 그래프 한 윈도우와 다음 커서. ?cursor=N&page_size=N&source=cache|log
+
+        응답의 source를 다음 요청에 그대로 넘기면 한 목록의 윈도우를 모두 같은 곳에서 읽는다.
+        """
+        source = request.args.get('source') or get_graph_page_source()
+        if source not in GRAPH_SOURCES:
+            raise ApiError(f"'source' must be one of: {', '.join(GRAPH_SOURCES)}.")
+        commit_data, next_cursor = get_git_graph_page(
+            _int_arg('cursor', 0), _int_arg('page_size', HISTORY_PAGE_SIZE, minimum=1), source
+        )
+        return jsonify({'commits': commit_data, 'next_cursor': next_cursor, 'source': source})
+
+    @app.get('/api/search')
+    @ref_state_etag
+    def search():
+        """커밋 검색 (NDJSON). ?q=<단어>&type=<타입>&author=<작성자>&since=YYYY-MM-DD&until=YYYY-MM-DD&limit=N"""
+        return ndjson_response(search_commits(
+            request.args.get('q', ''), _list_arg('type'), request.args.getlist('author'),
+            request.args.get('since') or None, request.args.get('until') or None,
+            _int_arg('limit', DEFAULT_SEARCH_LIMIT, minimum=1)
+        ))
+
+    @app.get('/api/merge-preview')
+    @ref_state_etag
+    def merge_preview():
+        """작업 트리를 건드리지 않는 머지 미리보기 (NDJSON). ?target=<브랜치>&source=<브랜치>[&source=...]
+
+        source가 없으면 target을 제외한 모든 로컬 브랜치를 미리보기한다.
+        """
+        target = request.args.get('target')
+        if not target:
+            raise ApiError("Missing required parameter: target.")
+        sources = _list_arg('source') or [r['name'] for r in list_refs(['branch']) if r['name'] != target]
+        return ndjson_response(preview_merges(sources, target))
+
+    @app.get('/api/status')
+    def status():
+        """작업 트리 변경 파일 목록 (참조와 무관하게 바뀌므로 캐시하지 않음)"""
+        response = jsonify(get_working_tree_status(refresh=request.args.get('refresh') == '1'))
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.post('/api/commit')
+    def commit():
+        """{"message": ...} 또는 {"type", "title", "description"}, 선택적으로 "paths": [...]"""
+        body = _json_body()
+        message = body.get('message')
+        if not message:
+            body = _json_body('type', 'title')
+            message = create_commit_message(body['type'], body['title'], body.get('description', ''))
+        paths = _string_list(body, 'paths') if body.get('paths') is not None else None
+        return _operation_result(execute_commit(message, paths))
+
+    @app.post('/api/merge')
+    def merge():
+        body = _json_body('source', 'target')
+        return _operation_result(execute_merge(body['source'], body['target']))
+
+    @app.post('/api/checkout')
+    def checkout():
+        body = _json_body('branch')
+        return _operation_result(execute_checkout(body['branch']))
+
+    @app.post('/api/branches')
+    def create_branch():
+        """{"name": ..., "base": ..., "checkout": false} 또는 여러 브랜치는 {"names": [...], "base": ...}"""
+        body = _json_body('base')
+        if 'names' in body:
+            return _operation_result(execute_create_branches(_string_list(body, 'names'), body['base']))
+        body = _json_body('name', 'base')
+        return _operation_result(execute_create_branch(body['name'], body['base'], bool(body.get('checkout'))))
+
+    @app.post('/api/pull')
+    def pull():
+        body = _json_body('branch')
+        return _operation_result(execute_pull(body['branch']))
+
+    @app.post('/api/push')
+    def push():
+        """{"branch": ...} 또는 여러 브랜치는 {"branches": [...]}"""
+        body = _json_body()
+        if 'branches' in body:
+            return _operation_result(execute_push(_string_list(body, 'branches')))
+        return _operation_result(execute_push(_json_body('branch')['branch']))
+
+    @app.post('/api/fetch')
+    def fetch():
+        body = request.get_json(silent=True) or {}
+        remote = body.get('remote', 'origin')
+        if not isinstance(remote, str):
+            raise ApiError("'remote' must be a string.")
+        try:
+            fetched = fetch_manager.fetch(remote, force=bool(body.get('force')))
+        except ValueError as e:
+            raise ApiError(str(e))
+        return jsonify({'ok': True, 'fetched': fetched, 'ref_state': get_ref_state()})
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="commit-frame JSON HTTP API")
+    parser.add_argument('--repo', default=os.getcwd(), help="repository to serve (default: current directory)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args(argv)
+
+    app = create_app(args.repo)
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
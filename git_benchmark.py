@@ -0,0 +1,388 @@
+"""commit-frame 성능 벤치마크
+
+합성 리포지토리를 만들고 주요 git_utils 작업의 실행 시간을 측정한다. 네트워크 없이
+로컬 bare 리포지토리를 원격으로 사용한다.
+
+    python git_benchmark.py generate /tmp/bench --commits 100000 --branches 20 --tags 500
+    python git_benchmark.py run /tmp/bench --output results.json
+    python git_benchmark.py run /tmp/bench --output new.json --baseline results.json --threshold 0.2
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import git_utils
+from git_utils import (
+    clear_commit_cache,
+    commit_types,
+    create_commit_message,
+    execute_checkout,
+    execute_commit,
+    execute_merge,
+    get_branch_status_overview,
+    get_git_graph_data,
+    get_git_graph_page,
+    get_git_refs,
+    set_repo_path
+)
+
+# 벤치마크 결과 형식 버전
+BENCHMARK_FORMAT_VERSION = 1
+
+# 기본 반복 횟수
+DEFAULT_REPEAT = 5
+
+# 기준 대비 중앙값이 이 비율 이상 느려지면 회귀로 판단
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+# 이 시간(초)보다 짧은 측정은 잡음이 커서 회귀 판단에서 제외
+MIN_COMPARABLE_SECONDS = 0.005
+
+# 합성 커밋 작성자 수
+SYNTHETIC_AUTHORS = 25
+
+# 합성 커밋 시작 시각과 간격 (초)
+SYNTHETIC_START_TIME = 1600000000
+SYNTHETIC_COMMIT_INTERVAL = 600
+
+# 원격 브랜치를 로컬과 어긋나게 만들 최소 커밋 수 (되감을 히스토리가 있어야 한다)
+MIN_DIVERGED_COMMITS = 100
+
+
+def _git(path, *args):
+    subprocess.run(['git', *args], cwd=path, check=True, stdout=subprocess.DEVNULL)
+
+
+def _data(payload):
+    return b'data %d\n%s\n' % (len(payload), payload)
+
+
+def generate_repository(path, commits=1000, branches=4, tags=10, merge_every=20, files=200, seed=0):
+    """git fast-import로 합성 리포지토리와 로컬 bare 원격을 만든다
+
+    커밋은 main과 feature 브랜치들에 나뉘어 쌓이고, main의 merge_every번째 커밋마다
+    feature 브랜치 하나를 병합한다. 태그는 main 커밋에 고르게 붙이며 주석 태그와
+    경량 태그를 번갈아 만든다. 원격은 path + '.remote.git'에 만들어지고 모든 브랜치가
+    upstream으로 연결된다. 이미 있는 경로에는 만들지 않는다.
+    """
+    path = os.path.abspath(path)
+    remote_path = path + '.remote.git'
+    for p in (path, remote_path):
+        if os.path.exists(p):
+            raise FileExistsError(f"'{p}' already exists.")
+
+    rng = random.Random(seed)
+    lines = ['main'] + [f'feature/{i}' for i in range(1, branches + 1)]
+    tips = {}            # 브랜치 -> 마지막 커밋 mark
+    unmerged = set()     # main에 병합되지 않은 커밋이 있는 feature 브랜치
+    main_count = 0
+    tag_count = 0
+    tag_every = max(1, commits // tags) if tags else 0
+
+    # 상위 디렉터리가 없어도 만들 수 있도록 리포지토리 디렉터리부터 만든다
+    os.makedirs(path, exist_ok=True)
+    _git(path, 'init', '-q', '-b', 'main')
+    proc = subprocess.Popen(['git', 'fast-import', '--quiet'], cwd=path, stdin=subprocess.PIPE)
+    write = proc.stdin.write
+    try:
+        for mark in range(1, commits + 1):
+            # main에 절반, 나머지는 feature 브랜치에 고르게
+            line = 'main' if not tips or branches == 0 or rng.random() < 0.5 else rng.choice(lines[1:])
+            timestamp = SYNTHETIC_START_TIME + mark * SYNTHETIC_COMMIT_INTERVAL
+            author = f'Dev{rng.randrange(SYNTHETIC_AUTHORS)}'
+            commit_type = rng.choice(commit_types)
+            message = create_commit_message(commit_type, f'change {mark}', f'synthetic change {mark} on {line}')
+
+            write(b'commit refs/heads/%s\nmark :%d\n' % (line.encode(), mark))
+            write(b'author %s <%s@example.com> %d +0000\n' % (author.encode(), author.lower().encode(), timestamp))
+            write(b'committer %s <%s@example.com> %d +0000\n' % (author.encode(), author.lower().encode(), timestamp))
+            write(_data(message.encode()))
+            parent = tips.get(line, tips.get('main'))
+            if parent:
+                write(b'from :%d\n' % parent)
+            if line == 'main' and merge_every and unmerged and main_count % merge_every == merge_every - 1:
+                source = rng.choice(sorted(unmerged))
+                unmerged.discard(source)
+                write(b'merge :%d\n' % tips[source])
+            write(b'M 644 inline f%d.txt\n' % (mark % files))
+            write(_data(b'%d\n' % mark))
+
+            tips[line] = mark
+            if line == 'main':
+                main_count += 1
+                # tag_every 커밋마다 그 뒤의 첫 main 커밋에 태그를 붙인다
+                if tag_every and mark // tag_every > tag_count:
+                    tag_count += 1
+                    name = f'v{tag_count}'.encode()
+                    if tag_count % 2:
+                        write(b'tag %s\nfrom :%d\n' % (name, mark))
+                        write(b'tagger Release <release@example.com> %d +0000\n' % timestamp)
+                        write(_data(b'release ' + name))
+                    else:
+                        write(b'reset refs/tags/%s\nfrom :%d\n\n' % (name, mark))
+            else:
+                unmerged.add(line)
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed.")
+
+    _git(path, 'config', 'user.name', 'Benchmark')
+    _git(path, 'config', 'user.email', 'benchmark@example.com')
+    _git(path, 'reset', '-q', '--hard', 'main')
+    _git(path, 'clone', '-q', '--bare', path, remote_path)
+    if commits >= MIN_DIVERGED_COMMITS:
+        _diverge_remote(remote_path, tips, rng)
+    _git(path, 'remote', 'add', 'origin', remote_path)
+    _git(path, 'fetch', '-q', 'origin')
+    # 브랜치가 많을 때 git config를 브랜치마다 실행하지 않도록 설정 파일에 직접 추가
+    with open(os.path.join(path, '.git', 'config'), 'a', encoding='utf-8') as f:
+        for line in tips:
+            f.write(f'[branch "{line}"]\n\tremote = origin\n\tmerge = refs/heads/{line}\n')
+    return path
+
+
+def _diverge_remote(remote_path, branches, rng):
+    """원격 브랜치를 로컬과 어긋나게 만들어 ahead/behind 계산에 실제 탐색이 필요하게 한다
+
+    브랜치를 번갈아 가며 원격을 몇 커밋 되감거나(ahead), 되감은 뒤 새 커밋을 얹거나(ahead와 behind),
+    새 커밋만 얹는다(behind).
+    """
+    proc = subprocess.Popen(['git', 'fast-import', '--quiet', '--force'], cwd=remote_path, stdin=subprocess.PIPE)
+    write = proc.stdin.write
+    try:
+        for i, branch in enumerate(branches):
+            base = f'refs/heads/{branch}^0' if i % 3 == 2 else f'refs/heads/{branch}~{rng.randint(1, 10)}'
+            if i % 3 == 0:
+                write(b'reset refs/heads/%s\nfrom %s\n\n' % (branch.encode(), base.encode()))
+                continue
+            message = create_commit_message('chore', f'remote change on {branch}', '')
+            write(b'commit refs/heads/%s\n' % branch.encode())
+            write(b'committer Remote <remote@example.com> %d +0000\n' % int(time.time()))
+            write(_data(message.encode()))
+            write(b'from %s\n' % base.encode())
+            write(b'M 644 inline remote.txt\n')
+            write(_data(branch.encode()))
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise RuntimeError("git fast-import failed.")
+
+
+def _measure(func, repeat, setup=None):
+    """setup 후 func 실행 시간을 repeat번 측정"""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return runs
+
+
+def _check(error):
+    """execute_* 함수가 에러 메시지를 반환하면 예외로 바꾼다"""
+    if error:
+        raise RuntimeError(error)
+
+
+def _load_graph():
+    commit_data, refs = get_git_graph_data()
+    if not commit_data:
+        raise RuntimeError("get_git_graph_data returned no commits.")
+
+
+def run_benchmarks(path, repeat=DEFAULT_REPEAT, only=None):
+    """리포지토리에서 각 작업을 측정하여 {이름: [초, ...]}를 반환
+
+    커밋, 체크아웃, 병합을 실제로 수행하므로 generate_repository로 만든 리포지토리에서만
+    실행해야 한다. only가 주어지면 해당 이름의 벤치마크만 실행한다.
+    """
+    # streamlit 임포트 시간이 첫 측정에 섞이지 않도록 미리 불러온다
+    from streamlit_app import render_git_graph
+
+    set_repo_path(os.path.abspath(path))
+    repo = git_utils.get_session().repo
+    counter = iter(range(1, 1 << 30))
+
+    def write_change():
+        with open(os.path.join(path, 'benchmark.txt'), 'a', encoding='utf-8') as f:
+            f.write(f'{next(counter)}\n')
+
+    def make_merge_source():
+        # 작업 트리를 건드리지 않고 main의 부모에서 갈라진 커밋을 만들어 병합 대상으로 쓴다
+        name = f'benchmark/merge-{next(counter)}'
+        sha = repo.git.commit_tree('main~1^{tree}', '-p', 'main~1', '-m', f'<chore>: {name}')
+        repo.git.branch('-f', name, sha)
+        merge_sources.append(name)
+
+    def render_graph():
+        commit_data, _ = get_git_graph_page()
+        render_git_graph(commit_data, get_git_refs())
+
+    feature_branches = [b.name for b in repo.branches if b.name.startswith('feature/')]
+    checkout_targets = itertools.cycle([feature_branches[0] if feature_branches else 'main', 'main'])
+    merge_sources = []
+
+    benchmarks = [
+        ('get_git_graph_data (cold)', _load_graph, clear_commit_cache),
+        ('get_git_graph_data (warm)', _load_graph, None),
+        ('render_git_graph', render_graph, None),
+        ('branch ahead/behind (cold)', get_branch_status_overview, git_utils._count_ahead_behind.cache_clear),
+        ('branch ahead/behind (warm)', get_branch_status_overview, None),
+        ('execute_checkout', lambda: _check(execute_checkout(next(checkout_targets))), None),
+        ('execute_commit', lambda: _check(execute_commit(create_commit_message('chore', 'benchmark', ''))),
+         write_change),
+        ('execute_merge', lambda: _check(execute_merge(merge_sources[-1], 'main')), make_merge_source),
+    ]
+
+    results = {}
+    _git(path, 'checkout', '-q', 'main')
+    for name, func, setup in benchmarks:
+        if only and name.split(' ')[0] not in only and name not in only:
+            continue
+        runs = _measure(func, repeat, setup)
+        results[name] = runs
+        print(f"{name:32} median {statistics.median(runs):8.4f}s  min {min(runs):8.4f}s", file=sys.stderr)
+    _git(path, 'checkout', '-q', 'main')
+    if merge_sources:
+        _git(path, 'branch', '-q', '-D', *merge_sources)
+    return results
+
+
+def _repository_stats(path):
+    def count(*args):
+        return int(subprocess.run(['git', *args], cwd=path, capture_output=True, text=True, check=True).stdout.split()[0])
+    return {
+        'commits': count('rev-list', '--count', '--all'),
+        'branches': len(subprocess.run(['git', 'branch', '--format=%(refname)'], cwd=path, capture_output=True,
+                                       text=True, check=True).stdout.split()),
+        'tags': len(subprocess.run(['git', 'tag'], cwd=path, capture_output=True, text=True, check=True).stdout.split())
+    }
+
+
+def build_report(path, results):
+    """측정 결과를 JSON으로 저장할 보고서 형태로 만든다"""
+    git_version = subprocess.run(['git', '--version'], capture_output=True, text=True).stdout.strip()
+    return {
+        'version': BENCHMARK_FORMAT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'git': git_version,
+            'backend': git_utils.COMMIT_EXTRACT_BACKEND
+        },
+        'repository': _repository_stats(path),
+        'results': {
+            name: {
+                'runs': runs,
+                'min': min(runs),
+                'median': statistics.median(runs),
+                'mean': statistics.fmean(runs)
+            }
+            for name, runs in results.items()
+        }
+    }
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD, thresholds=None):
+    """두 보고서의 중앙값을 비교
+
+    각 항목은 name, baseline, current, change(비율), regression 키를 가진다.
+    thresholds로 벤치마크별 허용 비율을 따로 지정할 수 있다.
+    """
+    thresholds = thresholds or {}
+    comparison = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        change = (result['median'] - base['median']) / base['median'] if base['median'] else 0.0
+        limit = thresholds.get(name, threshold)
+        comparison.append({
+            'name': name,
+            'baseline': base['median'],
+            'current': result['median'],
+            'change': change,
+            'regression': change > limit and result['median'] - base['median'] > MIN_COMPARABLE_SECONDS
+        })
+    return comparison
+
+
+def _parse_thresholds(values):
+    thresholds = {}
+    for value in values or []:
+        name, _, limit = value.rpartition('=')
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="commit-frame benchmark suite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generate', help="create a synthetic repository")
+    generate.add_argument('path')
+    generate.add_argument('--commits', type=int, default=1000)
+    generate.add_argument('--branches', type=int, default=4)
+    generate.add_argument('--tags', type=int, default=10)
+    generate.add_argument('--merge-every', type=int, default=20)
+    generate.add_argument('--files', type=int, default=200)
+    generate.add_argument('--seed', type=int, default=0)
+
+    run = subparsers.add_parser('run', help="run benchmarks against a synthetic repository")
+    run.add_argument('path', nargs='?', help="repository created by 'generate' (a temporary one is made if omitted)")
+    run.add_argument('--commits', type=int, default=1000, help="commits for the temporary repository")
+    run.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    run.add_argument('--only', nargs='*', help="benchmark names to run")
+    run.add_argument('--output', help="write the JSON report to this file")
+    run.add_argument('--baseline', help="compare against this JSON report")
+    run.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                     help="allowed slowdown of the median (0.2 = 20%%)")
+    run.add_argument('--benchmark-threshold', action='append', metavar='NAME=RATIO',
+                     help="per-benchmark allowed slowdown")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        started = time.perf_counter()
+        generate_repository(args.path, args.commits, args.branches, args.tags, args.merge_every, args.files, args.seed)
+        print(f"Generated {args.path} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        return 0
+
+    path = args.path
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='commit-frame-bench-'), 'repo')
+        generate_repository(path, args.commits)
+    report = build_report(path, run_benchmarks(path, args.repeat, args.only))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_reports(baseline, report, args.threshold, _parse_thresholds(args.benchmark_threshold))
+        for c in comparison:
+            mark = 'REGRESSION' if c['regression'] else 'ok'
+            print(f"{c['name']:32} {c['baseline']:8.4f}s -> {c['current']:8.4f}s  {c['change']:+7.1%}  {mark}",
+                  file=sys.stderr)
+        if any(c['regression'] for c in comparison):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+from html import escape
+
+# 그래프 배치 및 그리기 설정
+ROW_HEIGHT = 24
+LANE_WIDTH = 14
+NODE_RADIUS = 4
+GRAPH_PADDING = 10
+TEXT_FONT = "font-family:Arial,sans-serif;font-size:12px"
+
+# 레인별 선 색상
+LANE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#17becf']
+
+# 참조 종류별 배지 색상
+REF_COLORS = {
+    'branch': 'lightgreen',
+    'remote': 'orange',
+    'tag': 'lightblue'
+}
+
+
+def layout_graph(commit_data):
+    """git log --graph 처럼 커밋을 레인(열)에 배치
+
+    commit_data는 자식이 부모보다 먼저 오는 순서(최신순)여야 한다.
+    한 번의 순회로 각 커밋의 (row, lane)과 선분 목록
+    (from_row, from_lane, to_row, to_lane, color_lane)을 계산하여
+    (nodes, segments, lane_count)를 반환한다. 화면에 없는 부모로 이어지는
+    레인은 마지막 행 아래로 짧게 이어진다.
+    """
+    lanes = []    # 레인 -> 기다리는 부모 sha
+    origins = []  # 레인 -> 직전 행에서 선이 시작되는 레인
+    nodes = []
+    segments = []
+    lane_count = 0
+
+    for row, commit in enumerate(commit_data):
+        sha = commit['sha']
+        waiting = [lane for lane, pending in enumerate(lanes) if pending == sha]
+        if waiting:
+            col = waiting[0]
+        elif None in lanes:
+            col = lanes.index(None)
+        else:
+            col = len(lanes)
+            lanes.append(None)
+            origins.append(col)
+
+        # 직전 행에서 이어지는 선: 이 커밋을 기다리던 레인은 합쳐지고 나머지는 그대로 내려간다
+        for lane, pending in enumerate(lanes):
+            if pending is not None:
+                segments.append((row - 1, origins[lane], row, col if pending == sha else lane, lane))
+        for lane in waiting:
+            lanes[lane] = None
+        nodes.append((row, col))
+
+        origins = list(range(len(lanes)))
+        parents = commit['parents']
+        if parents:
+            lanes[col] = parents[0]
+            # 나머지 부모는 새 레인에서 시작 (이미 기다리는 레인이 있으면 나중에 합쳐진다)
+            for parent in parents[1:]:
+                if None in lanes:
+                    lane = lanes.index(None)
+                else:
+                    lane = len(lanes)
+                    lanes.append(None)
+                    origins.append(lane)
+                lanes[lane] = parent
+                origins[lane] = col
+
+        while lanes and lanes[-1] is None:
+            lanes.pop()
+            origins.pop()
+        lane_count = max(lane_count, len(lanes), col + 1)
+
+    # 화면 밖의 부모로 이어지는 레인
+    row = len(commit_data)
+    for lane, pending in enumerate(lanes):
+        if pending is not None:
+            segments.append((row - 1, origins[lane], row, lane, lane))
+
+    return nodes, segments, lane_count
+
+
+def _lane_x(lane):
+    return GRAPH_PADDING + lane * LANE_WIDTH + LANE_WIDTH // 2
+
+
+def _row_y(row):
+    return GRAPH_PADDING + row * ROW_HEIGHT + ROW_HEIGHT // 2
+
+
+def render_svg(commit_data, refs):
+    """레인 배치 결과를 SVG 문자열로 그림
+
+    refs는 get_git_refs()가 반환하는 {이름: {'type', 'sha'}} 형태이며
+    커밋 옆에 참조 배지로 표시된다.
+    """
+    nodes, segments, lane_count = layout_graph(commit_data)
+
+    ref_map = {}
+    for ref_name, ref_info in refs.items():
+        ref_map.setdefault(ref_info['sha'], []).append((ref_name, ref_info['type']))
+
+    # 같은 색의 선분은 하나의 path로 묶어 요소 수를 줄인다
+    paths = {}
+    half = ROW_HEIGHT // 2
+    for from_row, from_lane, to_row, to_lane, color_lane in segments:
+        x1, y1 = _lane_x(from_lane), _row_y(from_row)
+        x2, y2 = _lane_x(to_lane), _row_y(to_row)
+        if to_row >= len(commit_data):
+            y2 = y1 + half
+        if x1 == x2:
+            d = f"M{x1} {y1}V{y2}"
+        else:
+            d = f"M{x1} {y1}C{x1} {y1 + half} {x2} {y2 - half} {x2} {y2}"
+        paths.setdefault(color_lane % len(LANE_COLORS), []).append(d)
+
+    text_x = GRAPH_PADDING * 2 + lane_count * LANE_WIDTH
+    width = text_x + 900
+    height = GRAPH_PADDING * 2 + len(commit_data) * ROW_HEIGHT
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        '<g fill="none" stroke-width="2">'
+    ]
+    for color_index, ds in paths.items():
+        parts.append(f'<path stroke="{LANE_COLORS[color_index]}" d="{"".join(ds)}"/>')
+    parts.append('</g>')
+
+    parts.append(f'<g style="{TEXT_FONT}">')
+    for commit, (row, lane) in zip(commit_data, nodes):
+        cx, cy = _lane_x(lane), _row_y(row)
+        color = LANE_COLORS[lane % len(LANE_COLORS)]
+        parts.append(
+            f'<circle cx="{cx}" cy="{cy}" r="{NODE_RADIUS}" fill="{color}" stroke="white">'
+            f'<title>{escape(commit["sha"])}</title></circle>'
+        )
+
+        x = text_x
+        parts.append(f'<text x="{x}" y="{cy + 4}" fill="gray">{escape(commit["short_sha"])}</text>')
+        x += 60
+        for ref_name, ref_type in ref_map.get(commit['sha'], []):
+            badge_width = 7 * len(ref_name) + 8
+            parts.append(
+                f'<rect x="{x}" y="{cy - 8}" width="{badge_width}" height="16" rx="3" '
+                f'fill="{REF_COLORS.get(ref_type, "lightgrey")}"/>'
+                f'<text x="{x + 4}" y="{cy + 4}">{escape(ref_name)}</text>'
+            )
+            x += badge_width + 4
+        parts.append(
+            f'<text x="{x}" y="{cy + 4}"><tspan font-weight="bold">{escape(commit["message"])}</tspan>'
+            f'<tspan fill="gray"> — {escape(commit["author"])}, {escape(commit["date"])}</tspan></text>'
+        )
+    parts.append('</g></svg>')
+    return ''.join(parts)
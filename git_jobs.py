@@ -0,0 +1,200 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import git
+
+from git_trace import is_tracing, tracing
+from git_utils import OPERATION_CANCELLED, OPERATION_TIMED_OUT, OperationProgress, get_current_repo_path, use_repo_path
+
+# 동시에 실행할 작업 수
+MAX_JOB_WORKERS = 2
+
+# 작업 기본 제한 시간 (초)
+DEFAULT_JOB_TIMEOUT = 600
+
+# 레지스트리에 남겨둘 완료된 작업 수
+MAX_FINISHED_JOBS = 20
+
+# 작업 트리 lock을 기다리는 동안 취소 요청을 확인하는 간격 (초)
+WORKTREE_WAIT_INTERVAL = 0.2
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+JOB_TIMED_OUT = 'timed out'
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED, JOB_TIMED_OUT)
+
+# RemoteProgress 단계 이름
+STAGE_NAMES = {
+    git.RemoteProgress.COUNTING: 'Counting objects',
+    git.RemoteProgress.COMPRESSING: 'Compressing objects',
+    git.RemoteProgress.WRITING: 'Writing objects',
+    git.RemoteProgress.RECEIVING: 'Receiving objects',
+    git.RemoteProgress.RESOLVING: 'Resolving deltas',
+    git.RemoteProgress.FINDING_SOURCES: 'Finding sources',
+    git.RemoteProgress.CHECKING_OUT: 'Checking out files',
+}
+
+_executor = ThreadPoolExecutor(max_workers=MAX_JOB_WORKERS, thread_name_prefix='git-job')
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_ids = itertools.count(1)
+
+# 작업 트리를 바꾸는 작업이 잡는 리포지토리별 lock (리포지토리 경로 -> lock)
+_worktree_locks = {}
+
+
+class Job:
+    """백그라운드에서 실행되는 git 작업 하나의 상태"""
+
+    def __init__(self, job_id, description, timeout, worktree):
+        self.id = job_id
+        self.description = description
+        self.repo_path = get_current_repo_path()
+        self.trace = is_tracing()
+        self.timeout = timeout
+        self.worktree = worktree
+        self.status = JOB_QUEUED
+        self.stage = ''
+        self.progress = None  # 0.0 ~ 1.0, 알 수 없으면 None
+        self.message = ''
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.remote_progress = OperationProgress(self._on_progress)
+
+    def _on_progress(self, op_code, cur_count, max_count, message):
+        self.stage = STAGE_NAMES.get(op_code, self.stage)
+        self.progress = (cur_count / max_count) if max_count else None
+        if message:
+            self.message = message
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'repo_path': self.repo_path,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+def _worktree_lock(repo_path):
+    """리포지토리의 작업 트리 lock을 반환 (없으면 만든다)"""
+    with _jobs_lock:
+        return _worktree_locks.setdefault(repo_path, threading.Lock())
+
+
+def _wait_for_worktree(job, lock):
+    """같은 리포지토리에서 작업 트리를 바꾸는 다른 작업이 끝날 때까지 기다림. 기다리는 중에 취소되면 False"""
+    if lock.acquire(blocking=False):
+        return True
+    job.stage = 'Waiting for another job on this repository'
+    while not lock.acquire(timeout=WORKTREE_WAIT_INTERVAL):
+        if job.remote_progress.cancelled:
+            return False
+    job.stage = ''
+    return True
+
+
+def _run_job(job, func, args):
+    """작업 함수를 실행하고 결과에 따라 상태를 기록
+
+    func는 git_utils의 execute_* 함수처럼 실패 시 에러 메시지를, 성공 시 None을 반환하며
+    progress와 timeout 키워드 인자를 받아야 한다. 상태는 취소 요청 여부가 아니라 func가 실제로
+    어디서 멈췄는지(OPERATION_CANCELLED, OPERATION_TIMED_OUT 메시지)로 정한다.
+    작업 트리를 바꾸는 작업은 같은 리포지토리의 작업 트리 lock을 잡고 하나씩 실행한다.
+    """
+    lock = _worktree_lock(job.repo_path) if job.worktree else None
+    if job.remote_progress.cancelled or (lock is not None and not _wait_for_worktree(job, lock)):
+        job.status = JOB_CANCELLED
+        job.finished_at = time.time()
+        return
+
+    job.status = JOB_RUNNING
+    job.started_at = time.time()
+    try:
+        with use_repo_path(job.repo_path), tracing(job.trace):
+            error = func(*args, progress=job.remote_progress, timeout=job.timeout)
+    except Exception as e:
+        error = f"An unexpected error occurred: {str(e)}"
+    finally:
+        if lock is not None:
+            lock.release()
+    job.finished_at = time.time()
+
+    if error == OPERATION_CANCELLED:
+        job.status = JOB_CANCELLED
+        job.error = error
+    elif error == OPERATION_TIMED_OUT:
+        job.status = JOB_TIMED_OUT
+        job.error = f"Timed out after {job.timeout} seconds. Steps after the time limit were not run."
+    elif error:
+        job.status = JOB_FAILED
+        job.error = error
+    else:
+        job.status = JOB_SUCCEEDED
+        job.progress = 1.0
+
+
+def _prune_finished_jobs():
+    """오래된 완료 작업을 레지스트리에서 제거 (_jobs_lock을 잡은 상태에서 호출)"""
+    finished = sorted((j for j in _jobs.values() if j.finished), key=lambda j: j.finished_at)
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job.id]
+
+
+def submit_job(description, func, *args, timeout=DEFAULT_JOB_TIMEOUT, worktree=True):
+    """git 작업을 작업 풀에 등록하고 작업 id를 반환 (등록 시점의 작업 대상 리포지토리와 추적 설정으로 실행된다)
+
+    worktree가 True이면 작업 트리를 바꾸는 작업으로 보고, 같은 리포지토리의 다른 작업 트리 작업과 동시에 실행하지 않는다.
+    """
+    with _jobs_lock:
+        _prune_finished_jobs()
+        job = Job(next(_job_ids), description, timeout, worktree)
+        _jobs[job.id] = job
+    _executor.submit(_run_job, job, func, args)
+    return job.id
+
+
+def get_job(job_id):
+    """id로 작업을 찾음. 없으면 None"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def list_jobs():
+    """등록된 작업을 최신순으로 반환"""
+    with _jobs_lock:
+        return sorted(_jobs.values(), key=lambda j: j.id, reverse=True)
+
+
+def has_running_jobs():
+    """대기 중이거나 실행 중인 작업이 있는지 여부"""
+    with _jobs_lock:
+        return any(not j.finished for j in _jobs.values())
+
+
+def cancel_job(job_id):
+    """작업을 취소. 이미 끝난 작업이면 False 반환"""
+    job = get_job(job_id)
+    if job is None or job.finished:
+        return False
+    job.remote_progress.cancel()
+    return True
@@ -0,0 +1,342 @@
+import os
+import pickle
+import re
+import threading
+from array import array
+
+import git
+
+from git_trace import traced
+from git_utils import (
+    get_commit_changes,
+    get_commit_history,
+    get_commit_history_changes,
+    get_current_repo_path,
+    get_session,
+    tips_digest,
+    use_repo_path
+)
+
+# 검색 인덱스 파일 (.git 디렉토리 기준 상대 경로)
+# 기본 파일에 전체 인덱스를, 증분 파일에 갱신마다 추가/삭제된 커밋만 pickle 하나씩 이어 쓴다
+SEARCH_INDEX_FILE = os.path.join('commit-frame', 'search-index.pickle')
+SEARCH_INDEX_DELTA_FILE = os.path.join('commit-frame', 'search-index.delta.pickle')
+SEARCH_INDEX_VERSION = 2
+
+# 증분이 이 수만큼 쌓이면 기본 파일 하나로 합친다
+MAX_INDEX_SEGMENTS = 64
+
+# 삭제 표시된 문서 비율이 이 값을 넘으면 인덱스를 다시 만든다
+MAX_DELETED_RATIO = 0.25
+
+# 검색 결과 최대 개수
+DEFAULT_SEARCH_LIMIT = 200
+
+# 제목 줄의 커밋 타입: "<feat>: ..." (create_commit_message 형식) 또는 "feat(scope)!: ..."
+_TYPE_PATTERNS = (
+    re.compile(r'^<(\w+)>:'),
+    re.compile(r'^(\w+)(?:\([^)]*\))?!?:'),
+)
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+# 리포지토리별 메모리 인덱스 (.git 경로 -> 인덱스)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# 백그라운드에서 검색 인덱스를 만드는 중인 리포지토리 (.git 경로 -> 스레드)
+_index_builds = {}
+_index_builds_lock = threading.Lock()
+
+
+def parse_commit_type(title):
+    """커밋 제목 줄에서 타입(feat, fix, ...)을 추출. 없으면 빈 문자열"""
+    for pattern in _TYPE_PATTERNS:
+        match = pattern.match(title)
+        if match:
+            return match.group(1).lower()
+    return ''
+
+
+def tokenize(text):
+    """검색용 토큰 집합 (소문자 단어)"""
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def strip_commit_type(title):
+    """제목 줄에서 타입 접두어를 떼어낸 나머지"""
+    for pattern in _TYPE_PATTERNS:
+        match = pattern.match(title)
+        if match:
+            return title[match.end():].strip()
+    return title
+
+
+class CommitSearchIndex:
+    """구조화된 커밋 메시지에 대한 역색인
+
+    문서 번호는 추가된 순서대로 붙고, 각 역색인(토큰, 타입, 작성자, 월 단위 날짜)은
+    문서 번호의 정렬된 array로 저장된다. 더 이상 도달할 수 없는 커밋은 삭제 표시만 한다.
+    """
+
+    def __init__(self):
+        self.id = None  # 디스크에 기록된 기본 파일의 id (증분이 이 파일에 이어지는지 확인)
+        self.segments = 0
+        self.compact = True
+        self.tips = set()
+        self.shas = []
+        self.titles = []
+        self.authors = []
+        self.dates = []
+        self.deleted = set()
+        self.token_postings = {}
+        self.type_postings = {}
+        self.author_postings = {}
+        self.month_postings = {}
+
+    def __len__(self):
+        return len(self.shas) - len(self.deleted)
+
+    def add(self, records):
+        """커밋 레코드 목록을 색인에 추가"""
+        for sha, _, title, body, author, date, *_ in records:
+            doc = len(self.shas)
+            self.shas.append(sha)
+            self.titles.append(title)
+            self.authors.append(author)
+            self.dates.append(date)
+            for token in tokenize(f"{strip_commit_type(title)}\n{body}"):
+                self.token_postings.setdefault(token, array('I')).append(doc)
+            self.type_postings.setdefault(parse_commit_type(title), array('I')).append(doc)
+            self.author_postings.setdefault(author, array('I')).append(doc)
+            self.month_postings.setdefault(date[:7], array('I')).append(doc)
+
+    def remove(self, shas):
+        """커밋을 삭제 표시"""
+        shas = set(shas)
+        self.deleted.update(doc for doc, sha in enumerate(self.shas) if sha in shas)
+
+    def apply(self, steps):
+        """(new_records, dropped_shas) 변화 목록을 차례로 반영"""
+        for new_records, dropped in steps:
+            if dropped:
+                self.remove(dropped)
+            self.add(new_records)
+
+    def needs_rebuild(self):
+        return bool(self.shas) and len(self.deleted) / len(self.shas) > MAX_DELETED_RATIO
+
+    def search(self, query='', types=None, authors=None, since=None, until=None, limit=DEFAULT_SEARCH_LIMIT):
+        """조건에 맞는 커밋을 최신순으로 반환
+
+        query의 모든 단어를 포함하고, types/authors 중 하나에 해당하며,
+        날짜가 since~until('YYYY-MM-DD', 양 끝 포함) 안인 커밋만 남긴다.
+        """
+        candidates = None
+
+        def narrow(docs):
+            nonlocal candidates
+            candidates = set(docs) if candidates is None else candidates.intersection(docs)
+
+        # 결과가 작은 조건부터 좁혀 나간다
+        postings = []
+        for token in tokenize(query):
+            postings.append(self.token_postings.get(token, ()))
+        postings.sort(key=len)
+        for docs in postings:
+            narrow(docs)
+            if not candidates:
+                return []
+
+        if types:
+            narrow(doc for t in types for doc in self.type_postings.get(t, ()))
+        if authors:
+            narrow(doc for a in authors for doc in self.author_postings.get(a, ()))
+        if since or until:
+            start = since[:7] if since else ''
+            end = until[:7] if until else '9999-99'
+            narrow(doc for month, docs in self.month_postings.items() if start <= month <= end for doc in docs)
+
+        if candidates is None:
+            candidates = range(len(self.shas))
+        results = []
+        for doc in candidates:
+            if doc in self.deleted:
+                continue
+            day = self.dates[doc][:10]
+            if (since and day < since) or (until and day > until):
+                continue
+            results.append(doc)
+        results.sort(key=lambda doc: self.dates[doc], reverse=True)
+
+        return [
+            {
+                'sha': self.shas[doc],
+                'short_sha': self.shas[doc][:7],
+                'message': self.titles[doc],
+                'type': parse_commit_type(self.titles[doc]),
+                'author': self.authors[doc],
+                'date': self.dates[doc]
+            }
+            for doc in results[:limit]
+        ]
+
+    def known_authors(self):
+        """색인된 작성자 이름 목록"""
+        return sorted(self.author_postings)
+
+    def known_types(self):
+        """색인된 커밋 타입 목록"""
+        return sorted(t for t in self.type_postings if t)
+
+
+def _index_path(repo, name=SEARCH_INDEX_FILE):
+    return os.path.join(repo.common_dir, name)
+
+
+def _read_index(repo):
+    """디스크에서 검색 인덱스를 읽음. 없거나 형식이 다르면 None
+
+    기본 파일을 읽은 뒤 증분을 차례로 적용한다. 다른 기본 파일에 대한 증분은 건너뛰고, 잘리거나
+    이어지지 않는 증분을 만나면 거기서 멈추고 다음 기록 때 합치게 한다.
+    """
+    try:
+        with open(_index_path(repo), 'rb') as f:
+            version, index = pickle.load(f)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError):
+        return None
+    if version != SEARCH_INDEX_VERSION:
+        return None
+    index.segments = 0
+    index.compact = False
+
+    try:
+        with open(_index_path(repo, SEARCH_INDEX_DELTA_FILE), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            while f.tell() < size:
+                delta = pickle.load(f)
+                if delta['base'] != index.id:
+                    index.compact = True
+                    continue
+                if delta['from'] != tips_digest(index.tips):
+                    index.compact = True
+                    break
+                index.apply(delta['steps'])
+                index.tips = (index.tips - set(delta['tips_removed'])) | set(delta['tips_added'])
+                index.segments += 1
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, KeyError):
+        index.compact = True
+    return index
+
+
+def _write_index(repo, index):
+    """검색 인덱스 전체를 새 기본 파일로 원자적으로 기록하고 증분을 비움"""
+    path = _index_path(repo)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    index.id = os.urandom(8).hex()
+    index.segments = 0
+    index.compact = False
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((SEARCH_INDEX_VERSION, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    # 이전 기본 파일에 대한 증분은 id가 달라 읽을 때 무시되므로, 삭제 전에 중단되어도 안전하다
+    try:
+        os.remove(_index_path(repo, SEARCH_INDEX_DELTA_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def _append_index_delta(repo, index, old_tips, steps):
+    """갱신으로 추가/삭제된 커밋만 증분 파일 끝에 덧붙임"""
+    delta = {
+        'base': index.id,
+        'from': tips_digest(old_tips),
+        'tips_added': sorted(index.tips - old_tips),
+        'tips_removed': sorted(old_tips - index.tips),
+        'steps': steps
+    }
+    with open(_index_path(repo, SEARCH_INDEX_DELTA_FILE), 'ab') as f:
+        f.write(pickle.dumps(delta, protocol=pickle.HIGHEST_PROTOCOL))
+    index.segments += 1
+
+
+def _build_index():
+    """커밋 그래프 캐시의 전체 레코드로 인덱스를 새로 만든다"""
+    tips, records = get_commit_history()
+    index = CommitSearchIndex()
+    index.add(records)
+    index.tips = set(tips)
+    return index
+
+
+@traced(count=len)
+def get_search_index():
+    """현재 리포지토리의 검색 인덱스를 새 커밋만 반영하여 반환
+
+    커밋 그래프 캐시가 이미 계산한 참조 변화를 그대로 받아 적용하고(기록에 없을 때만 직접 계산),
+    디스크에는 바뀐 부분만 증분으로 덧붙인다.
+    """
+    repo = get_session().repo
+    key = repo.common_dir
+    with _indexes_lock:
+        index = _indexes.get(key) or _read_index(repo)
+        steps = None
+        if index is not None:
+            old_tips = index.tips
+            try:
+                tips, steps = get_commit_history_changes(old_tips)
+                if steps is None:
+                    steps = [get_commit_changes(old_tips, tips)]
+                if steps:
+                    index.apply(steps)
+                    index.tips = tips
+            except git.exc.GitCommandError:
+                index = None
+            if index is not None and index.needs_rebuild():
+                index = None
+        if index is None:
+            index = _build_index()
+        if index.compact or (steps and index.segments >= MAX_INDEX_SEGMENTS):
+            _write_index(repo, index)
+        elif steps:
+            _append_index_delta(repo, index, old_tips, steps)
+        _indexes[key] = index
+        return index
+
+
+def get_loaded_search_index():
+    """메모리에 있는 검색 인덱스를 갱신하지 않고 반환. 아직 읽지 않았으면 None"""
+    return _indexes.get(get_session().repo.common_dir)
+
+
+def load_search_index_in_background():
+    """현재 리포지토리의 검색 인덱스를 백그라운드 스레드에서 읽거나 만든다 (이미 진행 중이면 무시)
+
+    인덱스를 처음 만들 때는 커밋 그래프 캐시 전체가 필요하므로, 화면을 그리는 스레드가 기다리지 않게 한다.
+    """
+    path = get_current_repo_path()
+    key = get_session().repo.common_dir
+
+    def build():
+        try:
+            with use_repo_path(path):
+                get_search_index()
+        except Exception as e:
+            print(f"Failed to build the search index for {path}: {e}")
+        finally:
+            with _index_builds_lock:
+                _index_builds.pop(key, None)
+
+    with _index_builds_lock:
+        if key in _index_builds:
+            return
+        thread = _index_builds[key] = threading.Thread(target=build, name='git-search-index', daemon=True)
+    thread.start()
+
+
+@traced(count=len)
+def search_commits(query='', types=None, authors=None, since=None, until=None, limit=DEFAULT_SEARCH_LIMIT):
+    """커밋을 검색하여 commit_data 형식에 type을 더한 딕셔너리 목록을 반환 (parents와 body는 없음)"""
+    return get_search_index().search(query, types, authors, since, until, limit)
@@ -0,0 +1,215 @@
+import collections
+import contextlib
+import functools
+import os
+import threading
+import time
+
+# 추적 활성화 환경 변수 ('1'이면 시작부터 켠다)
+TRACE_ENV = 'COMMIT_FRAME_TRACE'
+
+# 메모리에 보관할 최대 span 수 (오래된 것부터 버린다)
+MAX_TRACE_SPANS = 20000
+
+# span 분류
+CATEGORY_OPERATION = 'operation'
+CATEGORY_GIT = 'git'
+CATEGORY_UI = 'ui'
+
+# 프로세스 기본값 (스레드에 따로 설정한 값이 없을 때 쓴다)
+_enabled = os.environ.get(TRACE_ENV, '') == '1'
+# 스레드별 설정 (Streamlit 세션마다 다른 실행 스레드를 쓰므로 탭마다 따로 켜고 끌 수 있다)
+_local = threading.local()
+_spans = collections.deque(maxlen=MAX_TRACE_SPANS)
+_spans_lock = threading.Lock()
+
+
+class Span:
+    """시작 시각, 걸린 시간, 부가 정보(args)를 가진 측정 구간 하나"""
+
+    __slots__ = ('name', 'category', 'args', 'thread_id', 'thread_name', 'start_ns', 'duration_ns')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start_ns = 0
+        self.duration_ns = 0
+
+    def set(self, **args):
+        """측정 중에 알게 된 정보(객체 수 등)를 추가"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        with _spans_lock:
+            _spans.append(self)
+        return False
+
+    @property
+    def duration(self):
+        """걸린 시간 (초)"""
+        return self.duration_ns / 1e9
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'category': self.category,
+            'thread': self.thread_name,
+            'start_ns': self.start_ns,
+            'duration': self.duration,
+            'args': dict(self.args)
+        }
+
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 쓰는 아무것도 하지 않는 span"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def is_tracing():
+    """현재 스레드에서 추적이 켜져 있는지 여부"""
+    return getattr(_local, 'enabled', _enabled)
+
+
+def set_tracing(enabled):
+    """프로세스 기본 추적 설정을 켜거나 끔 (tracing()으로 설정한 스레드는 영향을 받지 않는다)"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+@contextlib.contextmanager
+def tracing(enabled):
+    """with 블록 동안 현재 스레드에서만 추적을 켜거나 끔"""
+    previous = getattr(_local, 'enabled', None)
+    _local.enabled = bool(enabled)
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _local.enabled
+        else:
+            _local.enabled = previous
+
+
+def span(name, category=CATEGORY_OPERATION, **args):
+    """with 문으로 구간을 측정 (추적이 꺼져 있으면 비용이 거의 없는 빈 span을 반환)"""
+    if not is_tracing():
+        return _NULL_SPAN
+    return Span(name, category, args)
+
+
+def traced(name=None, category=CATEGORY_OPERATION, count=None):
+    """함수 호출 전체를 span으로 측정하는 데코레이터
+
+    count는 반환값에서 객체 수를 세는 함수이며, 결과는 span의 'count'로 기록된다.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_tracing():
+                return func(*args, **kwargs)
+            with Span(span_name, category, {}) as s:
+                result = func(*args, **kwargs)
+                if count is not None:
+                    s.set(count=count(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def format_command(cmd):
+    """명령 인자 목록을 로그용 한 줄 문자열로 변환"""
+    return ' '.join(str(arg) for arg in cmd)
+
+
+def git_span_name(cmd):
+    """git 명령 인자 목록에서 'git <하위 명령>' 형태의 span 이름을 만든다 (-c 등 전역 옵션은 건너뜀)"""
+    args = iter(cmd[1:] if cmd and os.path.basename(str(cmd[0])).startswith('git') else cmd)
+    for arg in args:
+        arg = str(arg)
+        if arg in ('-c', '-C'):
+            next(args, None)
+        elif not arg.startswith('-'):
+            return f'git {arg}'
+    return 'git'
+
+
+def git_span(cmd, **args):
+    """git 명령 하나를 측정하는 span (명령줄은 추적이 켜져 있을 때만 만든다)"""
+    if not is_tracing():
+        return _NULL_SPAN
+    return Span(git_span_name(cmd), CATEGORY_GIT, {'command': format_command(cmd), **args})
+
+
+def get_spans(since_ns=0):
+    """since_ns 이후에 시작한 span 목록 (시작 순)"""
+    with _spans_lock:
+        spans = [s for s in _spans if s.start_ns >= since_ns]
+    spans.sort(key=lambda s: s.start_ns)
+    return spans
+
+
+def clear_spans():
+    with _spans_lock:
+        _spans.clear()
+
+
+def summarize_spans(spans):
+    """이름별 호출 수, 총 시간, 최대 시간을 총 시간이 긴 순으로 반환"""
+    summary = {}
+    for s in spans:
+        entry = summary.setdefault(s.name, {'name': s.name, 'category': s.category, 'calls': 0, 'total': 0.0, 'max': 0.0})
+        entry['calls'] += 1
+        entry['total'] += s.duration
+        entry['max'] = max(entry['max'], s.duration)
+    return sorted(summary.values(), key=lambda e: e['total'], reverse=True)
+
+
+def export_chrome_trace(spans=None):
+    """span을 Chrome trace event 형식(chrome://tracing, Perfetto)의 딕셔너리로 변환"""
+    if spans is None:
+        spans = get_spans()
+    pid = os.getpid()
+    events = []
+    threads = {}
+    for s in spans:
+        threads.setdefault(s.thread_id, s.thread_name)
+        events.append({
+            'name': s.name,
+            'cat': s.category,
+            'ph': 'X',
+            'ts': s.start_ns / 1000,
+            'dur': s.duration_ns / 1000,
+            'pid': pid,
+            'tid': s.thread_id,
+            'args': {key: value if isinstance(value, (int, float, bool)) else str(value)
+                     for key, value in s.args.items()}
+        })
+    for thread_id, thread_name in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': thread_name}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
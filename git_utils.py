@@ -1,5 +1,22 @@
+import collections
+import contextlib
+import fnmatch
+import functools
+import gzip
+import hashlib
+import json
 import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import git
+from git.cmd import handle_process_output
+
+from git_trace import git_span, span, traced
 
 # 커밋 타입 옵션
 commit_types = ['feat', 'fix', 'docs', 'style', 'refactor', 'test', 'chore', 'build']
@@ -7,25 +24,446 @@ commit_types = ['feat', 'fix', 'docs', 'style', 'refactor', 'test', 'chore', 'bu
 # Git 리포지토리 경로
 repo_path = os.getcwd()  # 현재 작업 디렉토리로 설정, 필요에 따라 수정
 
+# Git History 페이지에서 한 번에 불러올 커밋 수
+HISTORY_PAGE_SIZE = 200
+
+# Git History 윈도우를 읽는 곳: 커밋 그래프 캐시 또는 git log 스트리밍
+GRAPH_SOURCE_CACHE = 'cache'
+GRAPH_SOURCE_LOG = 'log'
+GRAPH_SOURCES = (GRAPH_SOURCE_CACHE, GRAPH_SOURCE_LOG)
+
+# 커밋 그래프 캐시 파일 (.git 디렉토리 기준 상대 경로)
+# 기본 파일에 전체 목록을, 증분 파일에 갱신마다 바뀐 부분만 gzip 멤버 하나씩 이어 쓴다
+GRAPH_CACHE_FILE = os.path.join('commit-frame', 'graph-cache.json.gz')
+GRAPH_CACHE_DELTA_FILE = os.path.join('commit-frame', 'graph-cache.delta.gz')
+GRAPH_CACHE_VERSION = 2
+
+# 증분이 이 수만큼 쌓이면 기본 파일 하나로 합친다
+GRAPH_CACHE_MAX_SEGMENTS = 64
+
+# 커밋 추출 방식: 'log' (git log 한 번으로 일괄 추출) 또는 'gitpython' (객체 단위 읽기)
+COMMIT_EXTRACT_BACKEND = os.environ.get('COMMIT_FRAME_BACKEND', 'log')
+
+# git log 출력 형식 (NUL 구분: sha, 부모, 작성자, 날짜, 타임스탬프, 메시지)
+_LOG_FORMAT = '%H%x00%P%x00%an%x00%cd%x00%ct%x00%B'
+_LOG_FIELDS = 6
+_LOG_READ_SIZE = 1 << 20
+
+# 참조 종류별 이름 접두어
+REF_TYPE_PREFIXES = {
+    'branch': 'refs/heads/',
+    'remote': 'refs/remotes/',
+    'tag': 'refs/tags/'
+}
+
+# 그래프에 표시할 최대 태그 수 (버전이 높은 것부터, 0이면 제한 없음)
+MAX_DECORATED_TAGS = int(os.environ.get('COMMIT_FRAME_MAX_TAGS', '500'))
+
+# 머지 미리보기 (git merge-tree --write-tree는 Git 2.38부터 지원)
+MERGE_PREVIEW_MIN_GIT = (2, 38)
+MAX_PREVIEW_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+MERGE_UP_TO_DATE = 'up to date'
+MERGE_CLEAN = 'clean'
+MERGE_CONFLICTS = 'conflicts'
+MERGE_ERROR = 'error'
+
+# 취소나 제한 시간 초과로 다음 단계를 시작하지 않고 멈춘 작업의 결과 메시지
+OPERATION_CANCELLED = "Operation cancelled. Steps after the cancellation were not run."
+OPERATION_TIMED_OUT = "Operation timed out. Steps after the time limit were not run."
+
+# 리비전 인자로 허용하는 git 옵션 (그 밖의 '-'로 시작하는 값은 거부)
+REVISION_OPTIONS = ('--all', '--branches', '--tags', '--remotes')
+
+# 리포지토리별 메모리 캐시 (.git 경로 -> 캐시)
+_graph_caches = {}
+_graph_cache_lock = threading.Lock()
+
+# 백그라운드에서 커밋 그래프 캐시를 만드는 중인 리포지토리 (.git 경로 -> 스레드)
+_graph_cache_builds = {}
+_graph_cache_builds_lock = threading.Lock()
+
+# 프로세스 전역 리포지토리 세션 (경로 -> 세션, 최근 사용 순)
+MAX_SESSIONS = 8
+_sessions = {}
+_session_lock = threading.Lock()
+
+# 최근 fetch 결과를 재사용할 시간 (초)
+FETCH_TTL = float(os.environ.get('COMMIT_FRAME_FETCH_TTL', '60'))
+
+# 백그라운드 prefetch 간격 (초)
+PREFETCH_INTERVAL = float(os.environ.get('COMMIT_FRAME_PREFETCH_INTERVAL', '300'))
+
+# 작업 트리 상태 캐시를 재사용할 최대 시간 (초)
+STATUS_CACHE_TTL = 2.0
+
+# '1'이면 리포지토리에 설정되지 않은 경우 git status에 untracked cache와 fsmonitor를 켠다
+# (untracked cache는 인덱스에 기록되고 fsmonitor는 데몬을 띄우므로 기본으로는 켜지 않는다)
+FAST_STATUS = os.environ.get('COMMIT_FRAME_FAST_STATUS', '') == '1'
+
+# 작업 트리 상태 캐시 (리포지토리 경로 -> (캐시 키, 시각, 항목 목록))
+_status_caches = {}
+
+# 스레드별 작업 대상 리포지토리 (백그라운드 작업용)
+_thread_state = threading.local()
+
+
+class _TracedGit(git.Git):
+    """실행하는 git 명령마다 span을 기록하는 GitPython 명령 래퍼"""
+
+    def execute(self, command, *args, **kwargs):
+        # as_process 명령은 프로세스만 띄우고 바로 반환되므로 호출하는 쪽에서 측정한다
+        if kwargs.get('as_process'):
+            return super().execute(command, *args, **kwargs)
+        with git_span(command):
+            return super().execute(command, *args, **kwargs)
+
+    # 영속 cat-file 프로세스 읽기는 execute를 거치지 않으므로 따로 측정한다
+    # (get_object_data는 stream_object_data를 거치고, 본문은 반환된 스트림에서 읽는다)
+    def get_object_header(self, ref):
+        with git_span(['git', 'cat-file', '--batch-check'], object=ref):
+            return super().get_object_header(ref)
+
+    def stream_object_data(self, ref):
+        with git_span(['git', 'cat-file', '--batch'], object=ref):
+            return super().stream_object_data(ref)
+
+
+class _TracedRepo(git.Repo):
+    GitCommandWrapperType = _TracedGit
+
+
+class GitSession:
+    """리포지토리 하나에 대한 장기 세션
+
+    git.Repo 객체와 그 안의 영속 `cat-file --batch` / `--batch-check` 프로세스를
+    Streamlit 재실행 사이에 재사용한다. 영속 프로세스는 동시에 한 스레드만 사용할 수
+    있으므로, GitPython 객체(커밋, 참조의 .commit 등)를 읽는 코드는 lock을 잡고 실행한다.
+    새 git 프로세스를 띄우는 명령(repo.git.xxx, run)은 lock 없이 실행해도 된다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.repo = _TracedRepo(path)
+        self.lock = threading.RLock()
+        # 레지스트리에서 빠진 세션도 다른 탭이나 작업이 아직 쓰고 있을 수 있으므로, 마지막 참조가 사라질 때 닫는다
+        self._finalizer = weakref.finalize(self, self.repo.close)
+        self._warm_up()
+
+    def _warm_up(self):
+        """영속 cat-file 프로세스를 미리 띄워 첫 요청의 지연을 없앤다"""
+        with self.lock:
+            try:
+                self.repo.git.get_object_header('HEAD')
+                self.repo.git.get_object_data('HEAD')
+            except (ValueError, git.exc.GitCommandError):
+                pass  # 커밋이 없는 리포지토리
+
+    def run(self, args, input=None, ok_returncodes=(0,)):
+        """git 명령을 새 프로세스로 실행하고 표준 출력을 문자열로 반환
+
+        input은 stdin으로 전달한다. 종료 코드가 ok_returncodes에 없으면 GitCommandError를 발생시킨다.
+        """
+        cmd = ['git', *args]
+        with git_span(cmd):
+            result = subprocess.run(
+                cmd,
+                cwd=self.repo.working_dir,
+                input=input,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+            )
+        if result.returncode not in ok_returncodes:
+            raise git.exc.GitCommandError(cmd, result.returncode, result.stderr, result.stdout)
+        return result.stdout
+
+    def popen(self, args, stdin=subprocess.DEVNULL):
+        """git 명령을 스트리밍용 프로세스로 실행"""
+        return subprocess.Popen(
+            ['git', *args],
+            cwd=self.repo.working_dir,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def close(self):
+        """영속 프로세스를 정리"""
+        with self.lock:
+            self._finalizer()
+
+
+class OperationProgress(git.RemoteProgress):
+    """fetch/pull/push 진행 상황을 콜백으로 전달하고 실행 중인 작업의 취소를 지원"""
+
+    def __init__(self, callback=None):
+        super().__init__()
+        self.callback = callback
+        self.process = None
+        self.cancelled = False
+
+    def update(self, op_code, cur_count, max_count=None, message=''):
+        if self.callback:
+            self.callback(op_code & self.OP_MASK, cur_count, max_count, message)
+
+    def cancel(self):
+        """실행 중인 git 프로세스를 종료"""
+        self.cancelled = True
+        process = self.process
+        if process is not None:
+            process.proc.terminate()
+
+
+class OperationStopped(Exception):
+    """취소나 제한 시간 초과로 작업을 멈췄음을 알리는 예외 (메시지는 OPERATION_CANCELLED 또는 OPERATION_TIMED_OUT)"""
+
+
+def _deadline(timeout):
+    return None if timeout is None else time.monotonic() + timeout
+
+def _before_step(progress, deadline):
+    """상태를 바꾸는 다음 단계 전에 취소와 제한 시간을 확인하고 남은 시간(초)을 반환"""
+    if progress is not None and progress.cancelled:
+        raise OperationStopped(OPERATION_CANCELLED)
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise OperationStopped(OPERATION_TIMED_OUT)
+    return remaining
+
+def _run_step(progress, deadline, command, *args):
+    """로컬 git 명령(checkout, merge 등) 하나를 남은 제한 시간 안에서 실행"""
+    remaining = _before_step(progress, deadline)
+    try:
+        return command(*args, kill_after_timeout=remaining)
+    except git.exc.GitCommandError:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise OperationStopped(OPERATION_TIMED_OUT)
+        raise
+
+
+def set_repo_path(path):
+    """작업 대상 리포지토리 경로를 변경 (다음 get_session() 호출부터 해당 리포지토리의 세션을 쓴다)"""
+    global repo_path
+    repo_path = path
+
+def get_current_repo_path():
+    """현재 스레드의 작업 대상 리포지토리 경로"""
+    return getattr(_thread_state, 'repo_path', None) or repo_path
+
+@contextlib.contextmanager
+def use_repo_path(path):
+    """현재 스레드에서만 작업 대상 리포지토리를 임시로 변경"""
+    previous = getattr(_thread_state, 'repo_path', None)
+    _thread_state.repo_path = path
+    try:
+        yield
+    finally:
+        _thread_state.repo_path = previous
+
+def get_session():
+    """현재 작업 대상 리포지토리의 세션을 반환
+
+    세션은 경로별로 유지되며, MAX_SESSIONS개를 넘으면 가장 오래 쓰지 않은 세션을 목록에서 뺀다.
+    뺀 세션은 바로 닫지 않고, 그 세션을 쓰던 탭이나 작업이 모두 놓아 마지막 참조가 사라질 때 닫힌다.
+    """
+    path = get_current_repo_path()
+    with _session_lock:
+        session = _sessions.pop(path, None)
+        if session is None:
+            session = GitSession(path)
+        _sessions[path] = session
+        while len(_sessions) > MAX_SESSIONS:
+            del _sessions[next(iter(_sessions))]
+        return session
+
+class FetchManager:
+    """리모트별 fetch 스케줄러
+
+    마지막으로 성공한 fetch가 ttl 초 안이면 건너뛰고, 같은 리모트에 대한 동시 요청은
+    진행 중인 fetch 하나를 함께 기다린다. 등록한 리포지토리는 백그라운드에서 주기적으로
+    prefetch하여 merge/pull이 대부분 추가 네트워크 왕복 없이 시작되게 한다.
+    """
+
+    def __init__(self, ttl=FETCH_TTL, prefetch_interval=PREFETCH_INTERVAL):
+        self.ttl = ttl
+        self.prefetch_interval = prefetch_interval
+        self._lock = threading.Lock()
+        self._last_fetch = {}  # (리포지토리 경로, 리모트) -> 성공 시각 (time.monotonic)
+        self._in_flight = {}  # (리포지토리 경로, 리모트) -> Future
+        self._prefetch_paths = set()
+        self._prefetch_thread = None
+
+    @traced('FetchManager.fetch')
+    def fetch(self, remote='origin', force=False, progress=None, timeout=None):
+        """리모트를 fetch. TTL 안이라 건너뛰면 False, 실제로 fetch했거나 진행 중인 fetch를 기다렸으면 True"""
+        session = get_session()
+        # 리모트 이름은 git 명령줄로 전달되므로 등록된 리모트만 허용한다 (--upload-pack= 등 옵션 주입 방지)
+        if remote.startswith('-') or remote not in {r.name for r in session.repo.remotes}:
+            raise ValueError(f"Unknown remote: {remote}")
+        key = (session.path, remote)
+        with self._lock:
+            if not force and self._is_fresh(key):
+                return False
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                raise OperationStopped(OPERATION_TIMED_OUT)
+            except OperationStopped as e:
+                # 함께 기다리던 다른 요청의 fetch가 멈춘 것이므로 이 작업에서는 실패로 알린다
+                raise git.exc.GitCommandError(['git', 'fetch', remote], -1, f"The shared fetch stopped: {e}")
+
+        try:
+            _run_remote_command(session.repo, 'fetch', remote, progress=progress, timeout=timeout)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            with self._lock:
+                self._last_fetch[key] = time.monotonic()
+            future.set_result(True)
+            return True
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _is_fresh(self, key):
+        fetched_at = self._last_fetch.get(key)
+        return fetched_at is not None and time.monotonic() - fetched_at < self.ttl
+
+    def last_fetch_age(self, remote='origin'):
+        """현재 리포지토리의 리모트를 마지막으로 fetch한 뒤 지난 시간 (초). 기록이 없으면 None"""
+        fetched_at = self._last_fetch.get((get_current_repo_path(), remote))
+        return None if fetched_at is None else time.monotonic() - fetched_at
+
+    def invalidate(self, remote='origin'):
+        """현재 리포지토리의 fetch 기록을 지워 다음 요청이 반드시 fetch하게 함"""
+        with self._lock:
+            self._last_fetch.pop((get_current_repo_path(), remote), None)
+
+    def set_prefetch(self, enabled):
+        """현재 리포지토리의 백그라운드 prefetch를 켜거나 끔"""
+        path = get_current_repo_path()
+        with self._lock:
+            if enabled:
+                self._prefetch_paths.add(path)
+            else:
+                self._prefetch_paths.discard(path)
+            if enabled and self._prefetch_thread is None:
+                self._prefetch_thread = threading.Thread(
+                    target=self._prefetch_loop, name='git-prefetch', daemon=True
+                )
+                self._prefetch_thread.start()
+
+    def is_prefetching(self):
+        """현재 리포지토리가 백그라운드 prefetch 대상인지 여부"""
+        return get_current_repo_path() in self._prefetch_paths
+
+    def _prefetch_loop(self):
+        while True:
+            with self._lock:
+                paths = list(self._prefetch_paths)
+            for path in paths:
+                try:
+                    with use_repo_path(path):
+                        for remote in get_session().repo.git.remote().split():
+                            self.fetch(remote, timeout=self.prefetch_interval)
+                except Exception as e:
+                    print(f"Background prefetch failed for {path}: {e}")
+            time.sleep(self.prefetch_interval)
+
+
+fetch_manager = FetchManager()
+
 def create_commit_message(commit_type, commit_title, commit_description):
     """커밋 메시지를 정형화하여 반환"""
     commit_message = f"<{commit_type}>: {commit_title}\n<title>: {commit_title}\n<body>: {commit_description}"
     return commit_message
 
-def execute_commit(commit_message):
-    """Git 리포지토리에서 커밋을 실행"""
+def _run_remote_command(repo, command, *args, progress=None, timeout=None):
+    """fetch/pull/push 명령을 실행
+
+    progress(OperationProgress)가 있으면 진행 상황을 전달하고 progress.cancel()로
+    중단할 수 있게 한다. timeout(초)이 지나면 프로세스를 종료한다. 취소나 제한 시간 초과로
+    종료되면 OperationStopped를 발생시킨다.
+    """
+    deadline = _deadline(timeout)
+    if progress is None:
+        return _run_step(None, deadline, getattr(repo.git, command), '--', *args)
+    _before_step(progress, deadline)
+
+    # '--' 뒤의 인자는 옵션으로 해석되지 않는다
+    with git_span(['git', command, '--progress', '--', *args]):
+        proc = getattr(repo.git, command)('--progress', '--', *args, as_process=True)
+        progress.process = proc
+        try:
+            handle_process_output(
+                proc, None, progress.new_message_handler(), None,
+                decode_streams=False, kill_after_timeout=timeout
+            )
+            proc.wait(stderr='\n'.join(progress.error_lines + progress.other_lines))
+        except git.exc.GitCommandError:
+            _before_step(progress, deadline)  # 취소나 시간 초과로 종료된 경우
+            raise
+        finally:
+            progress.process = None
+
+def _pathspec_input(paths):
+    """경로 목록을 --pathspec-from-file 입력으로 변환 (glob 등 pathspec 해석을 끈다)"""
+    return '\0'.join(f':(literal){path}' for path in paths)
+
+@traced()
+def execute_commit(commit_message, paths=None):
+    """Git 리포지토리에서 커밋을 실행
+
+    paths가 None이면 모든 변경사항을, 경로 목록이면 해당 경로의 변경사항만 스테이징하여 커밋한다.
+    """
     try:
-        repo = git.Repo(repo_path)
-        repo.git.add(A=True)  # 모든 변경사항 스테이징
-        repo.index.commit(commit_message)  # 커밋 메시지 적용
+        session = get_session()
+        repo = session.repo
+        if paths is None:
+            repo.git.add(A=True)  # 모든 변경사항 스테이징
+            with session.lock:
+                repo.index.commit(commit_message)  # 커밋 메시지 적용
+        elif not paths:
+            return "Nothing to commit. No files selected."
+        else:
+            # 선택한 경로 중 작업 트리에 변경이 있는 것만 스테이징하고,
+            # 선택하지 않은 스테이징된 변경은 제외하고 커밋 (이름 변경은 원래 경로도 포함)
+            status = {e['path']: e for e in get_working_tree_status(refresh=True)}
+            add_paths = [p for p in paths if p in status and status[p]['worktree'] != '.']
+            commit_paths = list(paths) + [status[p]['orig_path'] for p in paths if p in status and status[p]['orig_path']]
+            pathspec_args = ['--pathspec-from-file=-', '--pathspec-file-nul']
+            if add_paths:
+                session.run(['add', '-A', *pathspec_args], input=_pathspec_input(add_paths))
+            session.run(['commit', '-m', commit_message, *pathspec_args], input=_pathspec_input(commit_paths))
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
             error_message = error_message.decode('utf-8')
-            
-        if "nothing to commit" in error_message.lower():
+        if not error_message.strip() and e.stdout:
+            error_message = e.stdout  # git commit은 "nothing to commit"을 표준 출력으로 알린다
+
+        lowered = error_message.lower()
+        if "nothing to commit" in lowered or "nothing added to commit" in lowered:
             return "Nothing to commit. No changes detected."
-        elif "not a git repository" in error_message.lower():
+        elif "no changes added to commit" in lowered:
+            return "Nothing to commit. The selected files have no changes."
+        elif "did not match any file" in lowered:
+            # error: pathspec 'x' did not match any file(s) known to git
+            match = re.search(r"pathspec '(?::\([^)]*\))?(.*)' did not match", error_message)
+            name = f"'{match.group(1)}'" if match else "A selected path"
+            return f"Nothing to commit. {name} is not a tracked or changed file."
+        elif "not a git repository" in lowered:
             return "Not a Git repository. Please check if the path is correct."
         else:
             return f"Error during commit: {error_message}"
@@ -33,14 +471,37 @@ def execute_commit(commit_message):
         return f"An unexpected error occurred: {str(e)}"
     return None
 
-def execute_merge(source_branch, target_branch):
+def _local_branch_exists(session, branch):
+    """로컬 브랜치가 있는지 확인 ('-'로 시작하는 이름은 git 옵션으로 해석되므로 없는 것으로 본다)"""
+    if branch.startswith('-'):
+        return False
+    status, _, _ = session.repo.git.show_ref(
+        '--verify', '-q', f'refs/heads/{branch}', with_exceptions=False, with_extended_output=True
+    )
+    return status == 0
+
+@traced()
+def execute_merge(source_branch, target_branch, progress=None, timeout=None):
     """Git 리포지토리에서 머지 작업을 실행"""
+    deadline = _deadline(timeout)
     try:
-        repo = git.Repo(repo_path)
-        origin = repo.remotes.origin
-        origin.fetch()  # 원격 저장소 업데이트
-        repo.git.checkout(target_branch)  # 대상 브랜치로 체크아웃
-        repo.git.merge(source_branch)  # 소스 브랜치를 대상 브랜치에 머지
+        session = get_session()
+        repo = session.repo
+        if not _local_branch_exists(session, target_branch):
+            return f"Branch '{target_branch}' not found."
+        # 원격 저장소 업데이트 (최근에 했으면 생략)
+        fetch_manager.fetch('origin', progress=progress, timeout=_before_step(progress, deadline))
+        if _resolve_commits(session, [source_branch])[0] is None:
+            return f"Branch '{source_branch}' not found."
+        # 충돌이 날 머지는 체크아웃하기 전에 미리보기로 걸러 작업 트리를 그대로 둔다
+        preview = preview_merge(source_branch, target_branch)
+        if preview['status'] == MERGE_CONFLICTS:
+            return f"Merge conflict detected in {', '.join(preview['conflicts'])}. Nothing was changed."
+        # 상태를 바꾸는 단계마다 취소와 제한 시간을 먼저 확인한다
+        _run_step(progress, deadline, repo.git.checkout, target_branch)  # 대상 브랜치로 체크아웃
+        _run_step(progress, deadline, repo.git.merge, source_branch)  # 소스 브랜치를 대상 브랜치에 머지
+    except OperationStopped as e:
+        return str(e)
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
@@ -58,11 +519,14 @@ def execute_merge(source_branch, target_branch):
         return f"An unexpected error occurred: {str(e)}"
     return None
 
+@traced()
 def execute_checkout(branch):
     """Git 리포지토리에서 브랜치 체크아웃을 실행"""
     try:
-        repo = git.Repo(repo_path)
-        repo.git.checkout(branch)
+        session = get_session()
+        if not _local_branch_exists(session, branch):
+            return f"Branch '{branch}' not found."
+        session.repo.git.checkout(branch, '--')  # '--'로 브랜치 이름임을 명시
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
@@ -80,49 +544,130 @@ def execute_checkout(branch):
         return f"An unexpected error occurred: {str(e)}"
     return None
 
-def execute_create_branch(new_branch_name, base_branch):
-    """새로운 브랜치를 생성하고 체크아웃"""
+def _locked_branch(error_message):
+    """update-ref 오류 메시지에서 문제가 된 브랜치 이름을 찾음"""
+    match = re.search(r"'refs/heads/([^']+)'", error_message)
+    return match.group(1) if match else None
+
+@traced()
+def execute_create_branch(new_branch_name, base_branch, checkout=False):
+    """base_branch가 가리키는 커밋에 새 브랜치를 만든다
+
+    작업 트리는 checkout이 True일 때만 새 브랜치로 전환한다.
+    """
+    error = execute_create_branches([new_branch_name], base_branch)
+    if error or not checkout:
+        return error
+    return execute_checkout(new_branch_name)
+
+@traced()
+def execute_create_branches(new_branch_names, base_branch):
+    """base_branch가 가리키는 커밋에 여러 브랜치를 체크아웃 없이 한 번에 만든다
+
+    `git update-ref --stdin` 트랜잭션 하나로 만들므로, 하나라도 실패하면 아무 브랜치도 만들지 않는다.
+    """
+    names = list(dict.fromkeys(name.strip() for name in new_branch_names if name.strip()))
+    if not names:
+        return "New branch name is required."
     try:
-        repo = git.Repo(repo_path)
-        # 기본 브랜치로 체크아웃
-        repo.git.checkout(base_branch)
-        # 새 브랜치 생성 및 체크아웃
-        repo.git.checkout('-b', new_branch_name)
+        session = get_session()
+        # 트랜잭션 전에 이름을 모두 검사한다 (@{-1} 같은 이름은 다른 브랜치로 풀리므로 출력이 같아야 유효)
+        for name in names:
+            checked = session.repo.git.check_ref_format('--branch', name, with_exceptions=False)
+            if name.startswith('-') or checked != name:
+                return f"'{name}' is not a valid branch name."
+        base_sha = session.repo.git.rev_parse('--verify', '-q', f'{base_branch}^{{commit}}', with_exceptions=False)
+        if not base_sha:
+            return f"Base branch '{base_branch}' not found."
+        commands = ''.join(f'create refs/heads/{name} {base_sha}\n' for name in names)
+        session.run(
+            ['update-ref', '--create-reflog', '-m', f'branch: Created from {base_branch}', '--stdin'],
+            input=commands
+        )
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
             error_message = error_message.decode('utf-8')
-            
-        if "already exists" in error_message.lower():
-            return f"Branch '{new_branch_name}' already exists."
+
+        if "already exists" in error_message.lower() or "exists; cannot create" in error_message.lower():
+            return f"Branch '{_locked_branch(error_message) or names[0]}' already exists."
+        elif "invalid ref format" in error_message.lower():
+            name = error_message.split('refs/heads/', 1)[-1].split()[0].rstrip("'")
+            return f"'{name}' is not a valid branch name."
         elif "not a git repository" in error_message.lower():
             return "Not a Git repository. Please check if the path is correct."
-        elif "did not match any file" in error_message.lower():
-            return f"Base branch '{base_branch}' not found."
         else:
             return f"Error during branch creation: {error_message}"
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
     return None
 
-def execute_pull(branch):
-    """Git 리포지토리에서 pull 작업을 실행"""
+def _checked_out_branches(session):
+    """워크트리별로 체크아웃된 브랜치 {브랜치 이름: 워크트리 경로}"""
+    branches = {}
+    worktree = None
+    for line in session.run(['worktree', 'list', '--porcelain']).splitlines():
+        if line.startswith('worktree '):
+            worktree = line[len('worktree '):]
+        elif line.startswith('branch refs/heads/'):
+            branches[line[len('branch refs/heads/'):]] = worktree
+    return branches
+
+@traced()
+def execute_pull(branch, progress=None, timeout=None):
+    """Git 리포지토리에서 pull 작업을 실행
+
+    현재 브랜치는 작업 트리에서 머지하고, 다른 브랜치는 체크아웃 없이 참조만 fast-forward한다.
+    """
+    deadline = _deadline(timeout)
     try:
-        repo = git.Repo(repo_path)
-        origin = repo.remotes.origin
-        origin.fetch()  # 원격 저장소 업데이트
-        repo.git.checkout(branch)  # 해당 브랜치로 체크아웃
-        repo.git.pull('origin', branch)  # 원격 저장소에서 pull
+        session = get_session()
+        repo = session.repo
+        if not _local_branch_exists(session, branch):
+            return f"Branch '{branch}' not found."
+        # 원격 저장소 업데이트 (최근에 했으면 생략)
+        fetch_manager.fetch('origin', progress=progress, timeout=_before_step(progress, deadline))
+        upstream = f'origin/{branch}'
+        checked_out = _checked_out_branches(session)
+        worktree = checked_out.get(branch)
+        if worktree is not None and os.path.realpath(worktree) == os.path.realpath(repo.working_dir):
+            _run_step(progress, deadline, repo.git.merge, upstream)  # fetch한 원격 브랜치를 머지 (git pull과 같은 동작)
+            return None
+        if worktree is not None:
+            return f"Branch '{branch}' is checked out in another worktree ({worktree}). Pull it there."
+
+        local_sha = repo.git.rev_parse('--verify', '-q', f'refs/heads/{branch}', with_exceptions=False)
+        if not local_sha:
+            return f"Branch '{branch}' not found."
+        upstream_sha = repo.git.rev_parse('--verify', '-q', f'refs/remotes/{upstream}', with_exceptions=False)
+        if not upstream_sha:
+            return f"Remote branch '{branch}' not found."
+        if local_sha == upstream_sha:
+            return None
+        def is_ancestor(ancestor, descendant):
+            return repo.git.merge_base(
+                '--is-ancestor', ancestor, descendant, with_exceptions=False, with_extended_output=True
+            )[0] == 0
+
+        if is_ancestor(upstream_sha, local_sha):
+            return None  # 로컬 브랜치가 앞서 있기만 하면 가져올 것이 없다
+        if not is_ancestor(local_sha, upstream_sha):
+            return f"Branch '{branch}' has diverged from '{upstream}'. Check it out to merge the remote changes."
+        # 이전 값을 함께 넘겨 그 사이에 브랜치가 움직였으면 실패하게 한다
+        _before_step(progress, deadline)
+        repo.git.update_ref('-m', f'pull: fast-forward from {upstream}', f'refs/heads/{branch}', upstream_sha, local_sha)
+    except OperationStopped as e:
+        return str(e)
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
             error_message = error_message.decode('utf-8')
-        
+
         if "conflict" in error_message.lower():
             return "Conflict detected. Local changes conflict with remote changes."
         elif "not a git repository" in error_message.lower():
             return "Not a Git repository. Please check if the path is correct."
-        elif "couldn't find remote ref" in error_message.lower():
+        elif "couldn't find remote ref" in error_message.lower() or "not something we can merge" in error_message.lower():
             return f"Remote branch '{branch}' not found."
         elif "authentication failed" in error_message.lower():
             return "Authentication failed. Please check your GitHub credentials."
@@ -136,20 +681,28 @@ def execute_pull(branch):
         return f"An unexpected error occurred: {str(e)}"
     return None
 
-def execute_push(branch):
-    """Git 리포지토리에서 push 작업을 실행"""
+@traced()
+def execute_push(branches, progress=None, timeout=None):
+    """로컬 브랜치(이름 하나 또는 목록)를 체크아웃 없이 refspec으로 한 번에 push"""
+    if isinstance(branches, str):
+        branches = [branches]
+    if not branches:
+        return "No branches selected."
     try:
-        repo = git.Repo(repo_path)
-        origin = repo.remotes.origin
-        repo.git.checkout(branch)  # 해당 브랜치로 체크아웃
-        repo.git.push('origin', branch)  # 원격 저장소로 push
+        repo = get_session().repo
+        refspecs = [f'refs/heads/{branch}:refs/heads/{branch}' for branch in branches]
+        _run_remote_command(repo, 'push', 'origin', *refspecs, progress=progress, timeout=timeout)  # 원격 저장소로 push
+    except OperationStopped as e:
+        return str(e)
     except git.exc.GitCommandError as e:
         error_message = e.stderr
         if isinstance(error_message, bytes):
             error_message = error_message.decode('utf-8')
-        
+
         if "not a git repository" in error_message.lower():
             return "Not a Git repository. Please check if the path is correct."
+        elif "src refspec" in error_message.lower() and "does not match any" in error_message.lower():
+            return f"Branch not found: {', '.join(branches)}."
         elif "authentication failed" in error_message.lower():
             return "Authentication failed. Please check your GitHub credentials."
         elif "permission denied" in error_message.lower():
@@ -162,51 +715,815 @@ def execute_push(branch):
         return f"An unexpected error occurred: {str(e)}"
     return None
 
-def get_git_graph_data():
-    """Git 그래프에 필요한 커밋과 참조 데이터를 가져오는 함수"""
+def _split_commit_message(message):
+    """커밋 메시지에서 제목 줄과 <body>: 섹션을 분리"""
+    parts = message.split('\n', 2)
+    title = parts[0]
+    body = ""
+    if len(parts) > 2 and parts[2].startswith('<body>: '):
+        body = parts[2][len('<body>: '):]
+    return title, body
+
+def _commit_to_record(commit):
+    """GitPython 커밋 객체를 캐시 레코드 [sha, parents, title, body, author, date, timestamp]로 변환"""
+    title, body = _split_commit_message(commit.message)
+    return [
+        commit.hexsha,
+        [p.hexsha for p in commit.parents],
+        title,
+        body,
+        commit.author.name,
+        commit.committed_datetime.strftime('%Y-%m-%d %H:%M'),
+        commit.committed_date,
+    ]
+
+def _record_to_dict(record):
+    """캐시 레코드를 commit_data 형식의 딕셔너리로 변환"""
+    sha, parents, title, body, author, date = record[:6]
+    return {
+        'sha': sha,
+        'short_sha': sha[:7],
+        'message': title,
+        'body': body,
+        'author': author,
+        'date': date,
+        'parents': parents
+    }
+
+def _commit_to_dict(commit):
+    """GitPython 커밋 객체를 commit_data 형식의 딕셔너리로 변환"""
+    return _record_to_dict(_commit_to_record(commit))
+
+def _parse_log_batch(tokens):
+    """git log 출력 필드 목록(커밋당 6개)을 캐시 레코드 목록으로 일괄 변환"""
+    fields = iter(tokens)
+    records = []
+    for sha, parents, author, date, timestamp, message in zip(*[fields] * _LOG_FIELDS):
+        title, body = _split_commit_message(message)
+        records.append([sha, parents.split(), title, body, author, date, int(timestamp)])
+    return records
+
+def split_revisions(revs):
+    """리비전 목록을 (허용된 옵션 목록, stdin으로 넘길 리비전 목록)으로 나눈다
+
+    '-'로 시작하는 값은 git 명령줄 옵션(--output 등)이 되므로 REVISION_OPTIONS에 있는 것만 허용하고,
+    나머지는 ValueError를 발생시킨다.
+    """
+    options = []
+    stdin_revs = []
+    for rev in revs:
+        if rev.startswith('-'):
+            if rev not in REVISION_OPTIONS:
+                raise ValueError(f"Unsupported revision option: {rev}")
+            options.append(rev)
+        else:
+            stdin_revs.append(rev)
+    return options, stdin_revs
+
+def iter_log_batches(session, args, field_count, revs, decode=True, read_size=_LOG_READ_SIZE):
+    """`git log -z` 한 번의 스트리밍 출력을 커밋 단위로 끊어진 필드 목록 묶음으로 생성
+
+    출력을 일정 크기씩 읽어 마지막 NUL까지 한 번에 나누고, 커밋 field_count개 필드가 모두 모인
+    만큼씩 내보낸다. revs는 split_revisions로 검사한 뒤 옵션만 명령줄에, 나머지는 stdin으로 넘긴다.
+    decode가 False면 필드를 bytes 그대로 내보낸다.
+    """
+    options, stdin_revs = split_revisions(revs)
+    cmd = ['git', 'log', '-z', *args, *options]
+    if stdin_revs:
+        cmd.append('--stdin')
+    cmd.append('--')
+    # 스트리밍 중에는 span이 열려 있으므로 측정 시간에 소비하는 쪽의 처리 시간도 포함된다
+    with git_span(cmd) as trace:
+        proc = session.popen(cmd[1:], stdin=subprocess.PIPE if stdin_revs else subprocess.DEVNULL)
+        try:
+            if stdin_revs:
+                proc.stdin.write(('\n'.join(stdin_revs) + '\n').encode('utf-8'))
+                proc.stdin.close()
+
+            pending = []
+            remainder = b''
+            commit_count = 0
+            while True:
+                chunk = proc.stdout.read(read_size)
+                if not chunk:
+                    break
+                # 마지막 NUL까지만 나눈다 (UTF-8 멀티바이트 문자 안에는 NUL이 없다)
+                data = remainder + chunk
+                cut = data.rfind(b'\0') + 1
+                remainder = data[cut:]
+                if not cut:
+                    continue
+                data = data[:cut]
+                tokens = (data.decode('utf-8', 'replace') if decode else data).split('\0' if decode else b'\0')
+                tokens.pop()
+                pending.extend(tokens)
+                complete = len(pending) - len(pending) % field_count
+                if complete:
+                    yield pending[:complete]
+                    del pending[:complete]
+                    commit_count += complete // field_count
+
+            returncode = proc.wait()
+            if returncode != 0:
+                raise git.exc.GitCommandError(cmd, returncode, proc.stderr.read())
+            if pending or remainder:
+                raise ValueError("Unexpected trailing output from git log.")
+            trace.set(count=commit_count)
+        finally:
+            # 제너레이터가 중간에 닫힌 경우 프로세스 정리
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if proc.stdin:
+                proc.stdin.close()
+            proc.stdout.close()
+            proc.stderr.close()
+
+def iter_commit_records(revs=('--all',), skip=0, max_count=None):
+    """커밋 레코드를 최신순으로 하나씩 생성하는 제너레이터
+
+    자식 커밋은 항상 부모보다 먼저 나온다 (--date-order). 기본은 git log 한 번으로 일괄 추출하고, COMMIT_EXTRACT_BACKEND가 'gitpython'이면
+    GitPython 객체 읽기 방식으로 동작한다. revs는 git rev-list 리비전 인자 목록이다.
+    """
+    session = get_session()
+    split_revisions(revs)  # 허용되지 않은 옵션은 어느 방식이든 먼저 거부
+    if COMMIT_EXTRACT_BACKEND == 'gitpython':
+        with span('GitPython commit parsing') as trace:
+            commit_count = 0
+            for commit in session.repo.iter_commits(list(revs), skip=skip, max_count=max_count, date_order=True):
+                with session.lock:
+                    record = _commit_to_record(commit)
+                commit_count += 1
+                yield record
+            trace.set(count=commit_count)
+        return
+
+    args = [f'--format={_LOG_FORMAT}', '--date=format:%Y-%m-%d %H:%M', '--date-order', f'--skip={skip}']
+    if max_count is not None:
+        args.append(f'--max-count={max_count}')
+    # 리비전이 많아도 명령줄 길이 제한에 걸리지 않도록 stdin으로 전달
+    for tokens in iter_log_batches(session, args, _LOG_FIELDS, revs):
+        yield from _parse_log_batch(tokens)
+
+def iter_git_commits(skip=0, max_count=None):
+    """모든 참조에서 도달 가능한 커밋을 최신순으로 하나씩 생성하는 제너레이터"""
+    for record in iter_commit_records(skip=skip, max_count=max_count):
+        yield _record_to_dict(record)
+
+def _matches_any(name, patterns):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+def _read_refs(session):
+    """`git show-ref -d` 한 번으로 모든 참조를 (참조 이름, sha, 벗긴 sha 또는 None) 목록으로 읽음
+
+    packed-refs에 저장된 벗긴(peeled) 값을 그대로 사용하므로 태그 객체를 하나씩 열지 않는다.
+    """
     try:
-        repo = git.Repo(repo_path)
-        
-        # 모든 커밋 가져오기
-        commits = list(repo.iter_commits('--all'))
-        
-        commit_data = []
-        for commit in commits:
-            message = commit.message
-            parts = message.split('\n', 2)
-            title = parts[0]
-            body = ""
-            if len(parts) > 2 and parts[2].startswith('<body>: '):
-                body = parts[2][len('<body>: '):]
-
-            commit_data.append({
-                'sha': commit.hexsha,
-                'short_sha': commit.hexsha[:7],
-                'message': title,
-                'body': body,
-                'author': commit.author.name,
-                'date': commit.committed_datetime.strftime('%Y-%m-%d %H:%M'),
-                'parents': [p.hexsha for p in commit.parents]
-            })
-            
-        # 모든 참조(브랜치, 원격 브랜치, 태그) 가져오기
-        refs = {}
-        # 로컬 브랜치
-        for branch in repo.branches:
-            refs[branch.name] = {'type': 'branch', 'sha': branch.commit.hexsha}
-        
-        # 원격 브랜치
-        for remote in repo.remotes:
-            for ref in remote.refs:
-                if 'HEAD' in ref.name:
+        output = session.run(['show-ref', '-d'])
+    except git.exc.GitCommandError as e:
+        if e.status == 1:
+            return []  # 참조가 하나도 없는 리포지토리
+        raise
+    refs = []
+    for line in output.splitlines():
+        sha, refname = line.split(' ', 1)
+        if refname.endswith('^{}'):
+            refs[-1][2] = sha
+        else:
+            refs.append([refname, sha, None])
+    return refs
+
+@traced(count=len)
+def list_refs(ref_types=None, include=None, exclude=None, max_tags=None):
+    """모든 참조를 한 번에 읽어 종류와 패턴으로 거른 목록을 반환
+
+    ref_types는 'branch', 'remote', 'tag' 중 읽을 종류, include/exclude는 짧은 이름
+    (예: 'main', 'origin/main', 'v1.0')에 대한 glob 패턴 목록이다. max_tags가 주어지면
+    버전이 높은 태그부터 그 수만큼만 남긴다. 원격 HEAD는 제외된다.
+    각 항목은 name, refname, type, sha(벗긴 대상), object(참조가 가리키는 객체) 키를 가진다.
+    sha는 보통 커밋이지만 트리 등을 가리키는 태그는 그 객체의 sha다.
+    """
+    session = get_session()
+    # 'refs/<kind>/' 의 kind -> (참조 종류, 접두어 길이)
+    kinds = {REF_TYPE_PREFIXES[t].split('/')[1]: (t, len(REF_TYPE_PREFIXES[t])) for t in (ref_types or REF_TYPE_PREFIXES)}
+    refs = []
+    tags = {}
+    for refname, sha, peeled_sha in _read_refs(session):
+        kind = kinds.get(refname[5:refname.find('/', 5)])
+        if kind is None:
+            continue
+        ref_type, prefix_length = kind
+        name = refname[prefix_length:]
+        if ref_type == 'remote' and name.endswith('/HEAD'):
+            continue
+        if include and not _matches_any(name, include):
+            continue
+        if exclude and _matches_any(name, exclude):
+            continue
+        ref = {'name': name, 'refname': refname, 'type': ref_type, 'sha': peeled_sha or sha, 'object': sha}
+        if ref_type == 'tag':
+            tags[refname] = ref
+        else:
+            refs.append(ref)
+
+    if max_tags and len(tags) > max_tags:
+        # 이름만 정렬하므로 태그 객체를 읽지 않는다
+        order = session.run(['for-each-ref', '--sort=-version:refname', '--format=%(refname)', 'refs/tags'])
+        selected = []
+        for refname in order.splitlines():
+            ref = tags.get(refname)
+            if ref is not None:
+                selected.append(ref)
+                if len(selected) >= max_tags:
+                    break
+        return refs + selected
+    return refs + list(tags.values())
+
+def get_git_refs(ref_types=None, include=None, exclude=None, max_tags=MAX_DECORATED_TAGS):
+    """참조(브랜치, 원격 브랜치, 태그)를 {이름: {'type', 'sha'}} 형태로 반환 (인자는 list_refs와 같다)"""
+    refs = {}
+    for ref in list_refs(ref_types, include, exclude, max_tags):
+        # 같은 짧은 이름이면 브랜치 > 원격 > 태그 순으로 먼저 나온 것을 유지
+        refs.setdefault(ref['name'], {'type': ref['type'], 'sha': ref['sha']})
+    return refs
+
+def _rev_list(session, revs):
+    """git rev-list로 revs에서 도달 가능한 커밋 sha 목록을 반환 (리비전은 stdin으로 전달)"""
+    return session.run(['rev-list', '--stdin'], input='\n'.join(revs) + '\n').split()
+
+def _get_ref_tips(session):
+    """--all 과 같은 기준으로 모든 참조와 HEAD가 가리키는 객체 sha 집합을 반환
+
+    태그는 벗긴 대상을 쓴다. 트리 등 커밋이 아닌 대상도 포함되지만 git log/rev-list는 이를 무시한다.
+    """
+    tips = {peeled_sha or sha for _, sha, peeled_sha in _read_refs(session)}
+    head = session.repo.git.rev_parse('--verify', '-q', 'HEAD', with_exceptions=False)
+    if head:
+        tips.add(head)  # 커밋이 없는 브랜치면 비어 있다
+    return tips
+
+def _graph_cache_path(repo, name=GRAPH_CACHE_FILE):
+    return os.path.join(repo.common_dir, name)
+
+def tips_digest(tips):
+    """참조 끝 집합을 나타내는 해시 (증분 파일이 어느 상태에 이어지는지 확인하는 데 쓴다)"""
+    return hashlib.sha1('\n'.join(sorted(tips)).encode('ascii')).hexdigest()
+
+def _read_graph_cache(repo):
+    """디스크에서 커밋 그래프 캐시를 읽음. 없거나 형식이 다르면 None
+
+    기본 파일을 읽은 뒤 증분을 차례로 적용한다. 다른 기본 파일에 대한 증분은 건너뛰고, 잘린 증분이나
+    이어지지 않는 증분(다른 프로세스가 동시에 쓴 경우)을 만나면 거기서 멈추고 다음 기록 때 합치게 한다.
+    """
+    try:
+        with gzip.open(_graph_cache_path(repo), 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != GRAPH_CACHE_VERSION:
+        return None
+    cache = {
+        'id': data['id'], 'tips': set(data['tips']), 'commits': data['commits'],
+        'segments': 0, 'compact': False, 'changes': collections.deque(maxlen=GRAPH_CACHE_MAX_SEGMENTS)
+    }
+
+    try:
+        with gzip.open(_graph_cache_path(repo, GRAPH_CACHE_DELTA_FILE), 'rt', encoding='utf-8') as f:
+            for line in f:
+                delta = json.loads(line)
+                if delta['base'] != cache['id']:
+                    cache['compact'] = True
                     continue
-                refs[ref.name] = {'type': 'remote', 'sha': ref.commit.hexsha}
-        
-        # 태그
-        for tag in repo.tags:
-            refs[tag.name] = {'type': 'tag', 'sha': tag.commit.hexsha}
+                if delta['from'] != tips_digest(cache['tips']):
+                    cache['compact'] = True
+                    break
+                tips = (cache['tips'] - set(delta['tips_removed'])) | set(delta['tips_added'])
+                _apply_graph_changes(cache, tips, delta['added'], set(delta['dropped']))
+                cache['segments'] += 1
+    except FileNotFoundError:
+        pass
+    except (OSError, EOFError, ValueError, KeyError):
+        cache['compact'] = True
+    return cache
+
+def _write_graph_cache(repo, cache):
+    """커밋 그래프 캐시 전체를 새 기본 파일로 원자적으로 기록하고 증분을 비움"""
+    path = _graph_cache_path(repo)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    cache_id = os.urandom(8).hex()
+    data = {'version': GRAPH_CACHE_VERSION, 'id': cache_id, 'tips': sorted(cache['tips']), 'commits': cache['commits']}
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    # 이전 기본 파일에 대한 증분은 id가 달라 읽을 때 무시되므로, 삭제 전에 중단되어도 안전하다
+    try:
+        os.remove(_graph_cache_path(repo, GRAPH_CACHE_DELTA_FILE))
+    except FileNotFoundError:
+        pass
+    cache.update(id=cache_id, segments=0, compact=False)
+
+def _append_graph_delta(repo, cache, old_tips, new_records, dropped):
+    """갱신으로 바뀐 부분만 증분 파일 끝에 gzip 멤버 하나로 덧붙임"""
+    delta = {
+        'base': cache['id'],
+        'from': tips_digest(old_tips),
+        'tips_added': sorted(cache['tips'] - old_tips),
+        'tips_removed': sorted(old_tips - cache['tips']),
+        'added': new_records,
+        'dropped': sorted(dropped)
+    }
+    line = json.dumps(delta, separators=(',', ':')) + '\n'
+    with open(_graph_cache_path(repo, GRAPH_CACHE_DELTA_FILE), 'ab') as f:
+        f.write(gzip.compress(line.encode('utf-8'), compresslevel=1))
+    cache['segments'] += 1
+
+def _build_graph_cache(repo, tips):
+    """모든 참조를 처음부터 탐색하여 캐시를 생성"""
+    commits = list(iter_commit_records())
+    return {
+        'id': None, 'tips': tips, 'commits': commits,
+        'segments': 0, 'compact': True, 'changes': collections.deque(maxlen=GRAPH_CACHE_MAX_SEGMENTS)
+    }
+
+@traced(count=lambda result: len(result[0]))
+def get_commit_changes(old_tips, tips):
+    """참조 끝이 old_tips에서 tips로 바뀔 때 달라진 커밋을 계산
+
+    (new_records, dropped_shas)를 반환한다. new_records는 새로 도달 가능해진 커밋의
+    레코드(자식이 먼저), dropped_shas는 사라진 참조에서만 도달 가능했던 커밋 sha 집합이다.
+    이전 참조 끝이 gc 등으로 사라졌으면 GitCommandError가 발생한다.
+    """
+    session = get_session()
+    added = tips - old_tips
+    removed = old_tips - tips
+    dropped = set()
+    if removed:
+        dropped = set(_rev_list(session, list(removed) + [f'^{sha}' for sha in tips]))
+    new_records = []
+    if added:
+        revs = list(added) + [f'^{sha}' for sha in old_tips]
+        new_records = list(iter_commit_records(revs))
+    return new_records, dropped
+
+@traced(count=len)
+def get_ref_tips():
+    """모든 참조와 HEAD가 가리키는 커밋 sha 집합"""
+    return _get_ref_tips(get_session())
+
+@traced(count=len)
+def get_ref_shas():
+    """모든 참조의 {참조 이름: sha} (주석 태그는 태그 객체의 sha)"""
+    return {refname: sha for refname, sha, _ in _read_refs(get_session())}
+
+@traced()
+def get_ref_state():
+    """HEAD와 모든 참조의 현재 값을 요약한 해시
+
+    참조가 하나라도 움직이거나, 체크아웃한 브랜치가 바뀌거나, HEAD가 다른 커밋으로 분리되면 값이 달라진다.
+    """
+    session = get_session()
+    digest = hashlib.sha1()
+    # HEAD 파일은 'ref: refs/heads/<브랜치>' 또는 분리된 HEAD의 sha이다
+    with open(os.path.join(session.repo.git_dir, 'HEAD'), 'rb') as f:
+        digest.update(f.read().strip() + b'\n')
+    try:
+        refs = session.run(['show-ref'])
+    except git.exc.GitCommandError as e:
+        if e.status != 1:
+            raise
+        refs = ''  # 참조가 하나도 없는 리포지토리
+    digest.update(refs.encode())
+    return digest.hexdigest()
+
+def _merge_commit_records(new_records, commits):
+    """새 커밋 레코드를 기존 목록에 끼워 넣은 새 목록을 반환
+
+    두 목록 모두 최신순이고 새 커밋은 기존 커밋의 조상이 될 수 없으므로, 커밋 시각 순으로 합치되
+    아직 내보내지 않은 새 자식 커밋이 있는 기존 커밋은 그 자식 뒤로 미룬다 (자식은 항상 부모보다 앞).
+    새 커밋이 모두 기존 커밋보다 최신이면 처음부터 만든 `git log --date-order`와 순서가 같지만, 오래된
+    날짜의 커밋을 fetch하면 다른 브랜치의 기존 커밋과의 순서가 달라질 수 있다. 그래서 한 목록의
+    윈도우는 모두 같은 곳(get_git_graph_page의 source)에서 읽어야 한다.
+    """
+    pending_children = collections.Counter(parent for record in new_records for parent in record[1])
+    merged = []
+    position = 0
+    for record in new_records:
+        while position < len(commits):
+            old = commits[position]
+            if pending_children[old[0]] or old[6] < record[6]:
+                break
+            merged.append(old)
+            position += 1
+        merged.append(record)
+        for parent in record[1]:
+            pending_children[parent] -= 1
+    merged.extend(commits[position:])
+    return merged
+
+def _apply_graph_changes(cache, tips, new_records, dropped):
+    """참조 끝 변화로 달라진 커밋을 캐시 목록에 반영하고 최근 변화 기록에 남김"""
+    cache['changes'].append((cache['tips'], tips, new_records, dropped))
+    commits = cache['commits']
+    # 사라진 참조에서만 도달 가능했던 커밋 제거
+    if dropped:
+        commits = [r for r in commits if r[0] not in dropped]
+    if new_records:
+        commits = _merge_commit_records(new_records, commits)
+    cache['tips'] = tips
+    cache['commits'] = commits
 
+def _update_graph_cache(cache, tips):
+    """참조 변화분만 탐색하여 캐시를 갱신. 변경이 없으면 None, 있으면 (new_records, dropped) 반환"""
+    if tips == cache['tips']:
+        return None
+
+    # 새 커밋은 이전 참조 끝에서 도달할 수 없는 커밋만이므로 이미 캐시에 있는지 확인할 필요가 없다
+    changes = get_commit_changes(cache['tips'], tips)
+    _apply_graph_changes(cache, tips, *changes)
+    return changes
+
+@traced(count=lambda result: len(result[1]))
+def get_commit_history():
+    """커밋 그래프 캐시를 증분 갱신하고 (참조 끝 집합, 커밋 레코드 목록)을 반환"""
+    session = get_session()
+    repo = session.repo
+    key = repo.common_dir
+    with _graph_cache_lock:
+        tips = _get_ref_tips(session)
+        cache = _graph_caches.get(key) or _read_graph_cache(repo)
+        changes = None
+        if cache is not None:
+            old_tips = cache['tips']
+            try:
+                changes = _update_graph_cache(cache, tips)
+            except git.exc.GitCommandError:
+                # 이전 참조 끝이 gc 등으로 사라진 경우 전체를 다시 만든다
+                cache = None
+        if cache is None:
+            cache = _build_graph_cache(repo, tips)
+        # 바뀐 부분만 증분으로 덧붙이고, 증분이 많이 쌓였거나 이어 쓸 수 없으면 전체를 다시 쓴다
+        if cache['compact'] or (changes and cache['segments'] >= GRAPH_CACHE_MAX_SEGMENTS):
+            _write_graph_cache(repo, cache)
+        elif changes:
+            _append_graph_delta(repo, cache, old_tips, *changes)
+        _graph_caches[key] = cache
+        return cache['tips'], cache['commits']
+
+def get_commit_history_changes(old_tips):
+    """커밋 그래프 캐시를 증분 갱신하고, 참조 끝이 old_tips였던 때 이후 캐시에 반영된 변화를 반환
+
+    (tips, steps)를 반환한다. steps는 (new_records, dropped_shas) 목록으로, 차례로 적용하면
+    old_tips 상태가 tips 상태가 된다. 최근 변화 기록에 old_tips 상태가 없으면 steps는 None이다.
+    검색 인덱스 등 캐시를 따라가는 쪽이 같은 참조 변화를 git으로 다시 계산하지 않게 한다.
+    """
+    tips, _ = get_commit_history()
+    with _graph_cache_lock:
+        cache = _graph_caches.get(get_session().repo.common_dir)
+        if cache is None:
+            return tips, None  # 그 사이에 캐시가 삭제된 경우
+        tips = cache['tips']
+        if old_tips == tips:
+            return tips, []
+        changes = list(cache['changes'])
+    for position in range(len(changes) - 1, -1, -1):
+        if changes[position][0] == old_tips:
+            return tips, [(new_records, dropped) for _, _, new_records, dropped in changes[position:]]
+    return tips, None
+
+def refresh_commit_cache():
+    """현재 참조 상태에 맞게 커밋 그래프 캐시를 증분 갱신하고 커밋 레코드 목록을 반환
+
+    캐시는 .git/commit-frame/ 아래에 저장되며, 참조 끝(tip) 집합이 바뀐 경우에만
+    새로 도달 가능한 커밋을 탐색한다.
+    """
+    return get_commit_history()[1]
+
+@traced()
+def clear_commit_cache():
+    """메모리와 디스크의 커밋 그래프 캐시를 삭제"""
+    repo = get_session().repo
+    with _graph_cache_lock:
+        _graph_caches.pop(repo.common_dir, None)
+        for name in (GRAPH_CACHE_FILE, GRAPH_CACHE_DELTA_FILE):
+            try:
+                os.remove(_graph_cache_path(repo, name))
+            except FileNotFoundError:
+                pass
+
+def _build_commit_cache_in_background():
+    """현재 리포지토리의 커밋 그래프 캐시를 백그라운드 스레드에서 읽거나 만든다 (이미 진행 중이면 무시)"""
+    path = get_current_repo_path()
+    key = get_session().repo.common_dir
+
+    def build():
+        try:
+            with use_repo_path(path):
+                get_commit_history()
+        except Exception as e:
+            print(f"Failed to build the commit graph cache for {path}: {e}")
+        finally:
+            with _graph_cache_builds_lock:
+                _graph_cache_builds.pop(key, None)
+
+    with _graph_cache_builds_lock:
+        if key in _graph_cache_builds:
+            return
+        thread = _graph_cache_builds[key] = threading.Thread(target=build, name='git-graph-cache', daemon=True)
+    thread.start()
+
+def get_graph_page_source():
+    """새 커밋 목록의 윈도우를 읽을 곳을 정함
+
+    커밋 그래프 캐시가 메모리에 있으면 GRAPH_SOURCE_CACHE, 없으면 캐시를 백그라운드에서 만들기 시작하고
+    전체 이력을 기다리지 않도록 GRAPH_SOURCE_LOG를 반환한다.
+    """
+    if get_session().repo.common_dir in _graph_caches:
+        return GRAPH_SOURCE_CACHE
+    _build_commit_cache_in_background()
+    return GRAPH_SOURCE_LOG
+
+@traced(count=lambda result: len(result[0]))
+def get_git_graph_page(cursor=0, page_size=HISTORY_PAGE_SIZE, source=None):
+    """커밋 한 윈도우를 가져오는 함수
+
+    cursor 번째 커밋부터 최대 page_size개를 읽어 (commit_data, next_cursor)를 반환한다.
+    더 읽을 커밋이 없으면 next_cursor는 None이다. source가 GRAPH_SOURCE_LOG면 이 윈도우만
+    `git log --skip --max-count`로 읽고, GRAPH_SOURCE_CACHE면 커밋 그래프 캐시에서 읽는다.
+    증분 갱신된 캐시의 순서는 git log와 다를 수 있으므로, 한 목록을 이어 읽을 때는 첫 윈도우의
+    source를 계속 넘겨야 커밋이 빠지거나 겹치지 않는다. None이면 get_graph_page_source()로 정한다.
+    """
+    try:
+        if source is None:
+            source = get_graph_page_source()
+        if source == GRAPH_SOURCE_LOG:
+            records = list(iter_commit_records(skip=cursor, max_count=page_size + 1))
+            commit_data = [_record_to_dict(r) for r in records[:page_size]]
+            return commit_data, cursor + page_size if len(records) > page_size else None
+        records = refresh_commit_cache()
+        commit_data = [_record_to_dict(r) for r in records[cursor:cursor + page_size]]
+        next_cursor = cursor + page_size if cursor + page_size < len(records) else None
+        return commit_data, next_cursor
+    except Exception as e:
+        print(f"Failed to get git data: {e}")
+        return [], None
+
+@traced(count=lambda result: len(result[0]))
+def get_git_graph_data(max_count=None):
+    """Git 그래프에 필요한 커밋과 참조 데이터를 가져오는 함수"""
+    try:
+        records = refresh_commit_cache()
+        if max_count is not None:
+            records = records[:max_count]
+        commit_data = [_record_to_dict(r) for r in records]
+        refs = get_git_refs()
         return commit_data, refs
     except Exception as e:
         print(f"Failed to get git data: {e}")
-        return [], {} 
\ No newline at end of file
+        return [], {}
+
+
+@functools.lru_cache(maxsize=4096)
+def _count_ahead_behind(path, local_sha, upstream_sha):
+    """두 커밋의 대칭 차집합을 한 번에 세어 (ahead, behind)를 반환 (sha 쌍 기준으로 메모이즈)"""
+    if local_sha == upstream_sha:
+        return 0, 0
+    output = get_session().repo.git.rev_list('--left-right', '--count', f'{local_sha}...{upstream_sha}')
+    ahead, behind = output.split()
+    return int(ahead), int(behind)
+
+@traced()
+def get_ahead_behind(local_sha, upstream_sha):
+    """로컬 커밋이 upstream 커밋보다 앞선/뒤처진 커밋 수를 (ahead, behind)로 반환"""
+    return _count_ahead_behind(get_session().path, local_sha, upstream_sha)
+
+def _parse_merge_tree(output):
+    """`git merge-tree --write-tree --name-only -z` 출력을 (트리 sha, 충돌 경로 목록, 충돌 메시지 목록)으로 변환"""
+    fields = output.split('\0')
+    tree = fields[0]
+    i = 1
+    conflicts = []
+    while i < len(fields) and fields[i]:
+        conflicts.append(fields[i])
+        i += 1
+    # 빈 필드 다음은 메시지 항목: <경로 수>, 경로들, 종류, 메시지
+    i += 1
+    messages = []
+    while i < len(fields) and fields[i]:
+        path_count = int(fields[i])
+        kind = fields[i + path_count + 1]
+        if kind.startswith('CONFLICT'):
+            messages.append(fields[i + path_count + 2].rstrip('\n'))
+        i += path_count + 3
+    return tree, conflicts, messages
+
+def _merge_preview_result(source_sha, target_sha, error=None):
+    return {
+        'source_sha': source_sha,
+        'target_sha': target_sha,
+        'status': MERGE_ERROR,
+        'commits': None,
+        'tree': None,
+        'conflicts': [],
+        'messages': [],
+        'error': error
+    }
+
+@functools.lru_cache(maxsize=4096)
+def _preview_merge(path, source_sha, target_sha):
+    """source 커밋을 target 커밋에 머지한 결과를 인덱스와 작업 트리 없이 계산 (sha 쌍 기준으로 메모이즈)"""
+    result = _merge_preview_result(source_sha, target_sha)
+    session = get_session()
+    try:
+        # target에 없는 source 커밋 수 (반대 방향은 target 히스토리 전체를 셀 수 있어 세지 않는다)
+        result['commits'] = int(session.run(['rev-list', '--count', f'{target_sha}..{source_sha}']))
+        if result['commits'] == 0:
+            result['status'] = MERGE_UP_TO_DATE
+            return result
+        if session.repo.git.version_info < MERGE_PREVIEW_MIN_GIT:
+            result['error'] = "Merge preview requires Git 2.38 or later."
+            return result
+        # 종료 코드 1은 충돌이 있다는 뜻
+        output = session.run(
+            ['merge-tree', '--write-tree', '--name-only', '-z', target_sha, source_sha], ok_returncodes=(0, 1)
+        )
+    except git.exc.GitCommandError as e:
+        stderr = e.stderr.decode('utf-8', 'replace') if isinstance(e.stderr, bytes) else e.stderr
+        result['error'] = stderr.strip().removeprefix("stderr: '").removesuffix("'").strip() or str(e)
+        return result
+
+    result['tree'], result['conflicts'], result['messages'] = _parse_merge_tree(output)
+    result['status'] = MERGE_CONFLICTS if result['conflicts'] else MERGE_CLEAN
+    return result
+
+def _resolve_commits(session, revs):
+    """리비전 목록을 커밋 sha 목록으로 변환 (찾을 수 없는 리비전은 None)"""
+    if any(rev.startswith('-') for rev in revs):
+        # rev-parse는 모르는 옵션을 그대로 출력하므로 옵션처럼 보이는 리비전은 찾을 수 없는 것으로 본다
+        return [None if rev.startswith('-') else _resolve_commits(session, [rev])[0] for rev in revs]
+    try:
+        return session.run(['rev-parse', *[f'{rev}^{{commit}}' for rev in revs]]).split()
+    except git.exc.GitCommandError:
+        # 하나라도 실패하면 어느 것이 없는지 알 수 없으므로 하나씩 다시 확인
+        return [session.repo.git.rev_parse('--verify', '-q', f'{rev}^{{commit}}', with_exceptions=False) or None
+                for rev in revs]
+
+@traced()
+def preview_merge(source_branch, target_branch):
+    """source_branch를 target_branch에 머지했을 때의 결과를 작업 트리를 건드리지 않고 계산
+
+    status는 MERGE_UP_TO_DATE, MERGE_CLEAN, MERGE_CONFLICTS, MERGE_ERROR 중 하나이며,
+    commits는 머지될 커밋 수, tree는 머지 결과 트리 sha, conflicts는 충돌 경로 목록,
+    messages는 충돌 설명 목록이다. 결과는 (source sha, target sha) 쌍별로 캐시된다.
+    """
+    return preview_merges([source_branch], target_branch)[0]
+
+@traced(count=len)
+def preview_merges(source_branches, target_branch, max_workers=MAX_PREVIEW_WORKERS):
+    """여러 source 브랜치를 target_branch에 머지한 결과를 제한된 스레드 풀에서 동시에 미리보기
+
+    결과는 입력 순서대로이며, 각 항목은 preview_merge의 결과에 source, target 키를 더한 딕셔너리다.
+    """
+    if not source_branches:
+        return []
+    session = get_session()
+    source_branches = list(source_branches)
+    target_sha, *source_shas = _resolve_commits(session, [target_branch, *source_branches])
+
+    def preview(source_branch, source_sha):
+        if target_sha is None or source_sha is None:
+            missing = target_branch if target_sha is None else source_branch
+            result = _merge_preview_result(source_sha, target_sha, f"Branch '{missing}' not found.")
+        else:
+            with use_repo_path(session.path):
+                result = _preview_merge(session.path, source_sha, target_sha)
+            # 캐시된 메시지의 sha를 요청한 브랜치 이름으로 바꿔 보여준다
+            messages = [m.replace(source_sha, source_branch).replace(target_sha, target_branch)
+                        for m in result['messages']]
+            result = {**result, 'messages': messages}
+        return {'source': source_branch, 'target': target_branch, **result}
+
+    workers = min(max_workers, len(source_branches))
+    if workers <= 1:
+        return [preview(b, sha) for b, sha in zip(source_branches, source_shas)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='merge-preview') as executor:
+        return list(executor.map(preview, source_branches, source_shas))
+
+@traced(count=len)
+def get_branch_status_overview():
+    """모든 로컬 브랜치의 upstream 대비 상태를 한 번에 계산
+
+    for-each-ref 한 번으로 브랜치와 upstream의 sha를 읽고, ahead/behind는
+    (로컬 sha, upstream sha) 쌍별로 메모이즈된 값을 사용한다.
+    각 항목은 branch, sha, upstream, upstream_sha, ahead, behind 키를 가지며
+    upstream이 없거나 upstream 참조가 사라진 경우 ahead/behind는 None이다.
+    """
+    session = get_session()
+    output = session.repo.git.for_each_ref(
+        'refs/heads', 'refs/remotes',
+        format='%(refname)%00%(refname:short)%00%(objectname)%00%(upstream)%00%(upstream:short)'
+    )
+    ref_shas = {}
+    branches = []
+    for line in output.splitlines():
+        refname, short_name, sha, upstream, upstream_short = line.split('\0')
+        ref_shas[refname] = sha
+        if refname.startswith('refs/heads/'):
+            branches.append((short_name, sha, upstream, upstream_short))
+
+    overview = []
+    for branch, sha, upstream, upstream_short in branches:
+        upstream_sha = ref_shas.get(upstream)
+        ahead = behind = None
+        if upstream_sha:
+            ahead, behind = _count_ahead_behind(session.path, sha, upstream_sha)
+        overview.append({
+            'branch': branch,
+            'sha': sha,
+            'upstream': upstream_short or None,
+            'upstream_sha': upstream_sha,
+            'ahead': ahead,
+            'behind': behind
+        })
+    return overview
+
+
+def _status_config_args(session):
+    """FAST_STATUS가 켜져 있으면 리포지토리에 설정되지 않은 untracked cache와 fsmonitor를 켜는 git -c 인자
+
+    리포지토리나 사용자 설정에 값이 있으면 그대로 따른다.
+    """
+    if not FAST_STATUS:
+        return []
+    config = session.repo.config_reader()
+    args = []
+    if not config.has_option('core', 'untrackedCache'):
+        args += ['-c', 'core.untrackedCache=true']
+    # 내장 fsmonitor 데몬은 macOS와 Windows에서만 지원된다
+    if not config.has_option('core', 'fsmonitor') and sys.platform in ('darwin', 'win32'):
+        if session.repo.git.version_info >= (2, 36):
+            args += ['-c', 'core.fsmonitor=true']
+    return args
+
+def _parse_status(output):
+    """git status --porcelain=v2 -z 출력을 변경 항목 목록으로 변환"""
+    entries = []
+    fields = iter(output.split('\0'))
+    for line in fields:
+        if not line or line.startswith('#'):
+            continue
+        kind = line[0]
+        if kind == '?':
+            entries.append({'path': line[2:], 'orig_path': None, 'index': '?', 'worktree': '?'})
+        elif kind == '1':
+            parts = line.split(' ', 8)
+            entries.append({'path': parts[8], 'orig_path': None, 'index': parts[1][0], 'worktree': parts[1][1]})
+        elif kind == '2':
+            parts = line.split(' ', 9)
+            orig_path = next(fields, None)  # 이름 변경 전 경로는 다음 필드
+            entries.append({'path': parts[9], 'orig_path': orig_path, 'index': parts[1][0], 'worktree': parts[1][1]})
+        elif kind == 'u':
+            parts = line.split(' ', 10)
+            entries.append({'path': parts[10], 'orig_path': None, 'index': 'U', 'worktree': 'U'})
+    return entries
+
+def _status_cache_key(session, entries):
+    """인덱스, HEAD, 그리고 변경된 경로들의 stat으로 캐시 키를 만든다"""
+    def stat_key(path):
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    git_dir = session.repo.git_dir
+    work_dir = session.repo.working_dir
+    watched = tuple(stat_key(os.path.join(work_dir, e['path'])) for e in entries)
+    return stat_key(os.path.join(git_dir, 'index')), stat_key(os.path.join(git_dir, 'HEAD')), watched
+
+@traced(count=len)
+def get_working_tree_status(refresh=False):
+    """작업 트리의 변경 파일 목록을 반환
+
+    `git status --porcelain=v2` 한 번으로 읽으며, FAST_STATUS가 켜져 있으면 untracked cache와 fsmonitor를 사용한다.
+    인덱스나 변경된 경로가 바뀌지 않았고 STATUS_CACHE_TTL이 지나지 않았으면 이전 결과를 재사용한다.
+    각 항목은 path, orig_path(이름 변경 전 경로), index, worktree(상태 문자) 키를 가진다.
+    """
+    session = get_session()
+    cached = _status_caches.get(session.path)
+    if cached and not refresh:
+        key, checked_at, entries = cached
+        if time.monotonic() - checked_at < STATUS_CACHE_TTL and key == _status_cache_key(session, entries):
+            return entries
+
+    output = session.run([
+        *_status_config_args(session),
+        'status', '--porcelain=v2', '-z', '--untracked-files=all'
+    ])
+    entries = _parse_status(output)
+    _status_caches[session.path] = (_status_cache_key(session, entries), time.monotonic(), entries)
+    return entries
+
+def clear_status_cache():
+    """현재 리포지토리의 작업 트리 상태 캐시를 삭제"""
+    _status_caches.pop(get_current_repo_path(), None)
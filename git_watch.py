@@ -0,0 +1,280 @@
+import collections
+import os
+import threading
+import time
+
+import git
+
+from git_trace import span
+from git_utils import clear_status_cache, get_commit_history, get_current_repo_path, get_ref_shas, get_session, use_repo_path
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# 파일 시스템 이벤트를 쓸 수 없을 때 .git 파일의 stat을 확인하는 간격 (초)
+WATCH_POLL_INTERVAL = float(os.environ.get('COMMIT_FRAME_WATCH_INTERVAL', '1'))
+
+# git 명령 하나가 여러 파일을 연달아 바꾸므로 첫 이벤트 후 잠시 모았다가 확인한다 (초)
+WATCH_DEBOUNCE = 0.2
+
+# 감시자별로 보관할 최근 변경 수
+MAX_WATCH_EVENTS = 50
+
+# 감시 모드
+WATCH_EVENTS = 'events'
+WATCH_POLLING = 'polling'
+
+# .git 디렉토리 바로 아래에서 감시하는 파일
+_WATCHED_FILES = ('HEAD', 'index', 'packed-refs')
+
+# 리포지토리별 감시자 (경로 -> 감시자)
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+    except OSError:
+        return None
+
+
+if WATCHDOG_AVAILABLE:
+    class _GitDirEventHandler(FileSystemEventHandler):
+        """HEAD, index, packed-refs, refs/ 아래 파일이 바뀌면 감시자를 깨운다"""
+
+        def __init__(self, watcher):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            # 참조는 '<이름>.lock'에 쓴 뒤 이름을 바꾸므로 이동 이벤트는 대상 경로를 본다
+            paths = (event.src_path, getattr(event, 'dest_path', '') or '')
+            if any(self.watcher.is_watched_path(os.fsdecode(p)) for p in paths if p):
+                self.watcher.wake()
+
+
+class RepositoryWatcher:
+    """리포지토리의 HEAD, 참조, 인덱스 변경을 감지하여 캐시에 변경분만 반영
+
+    watchdog이 있으면 inotify 등 파일 시스템 이벤트로, 없으면 poll_interval마다 stat을 비교하여
+    변경을 감지한다. 변경이 감지되면 `git show-ref` 한 번으로 움직인 참조를 계산하고,
+    커밋 그래프 캐시를 증분 갱신한 뒤 version을 올리고 구독자에게 알린다.
+    """
+
+    def __init__(self, path, poll_interval=WATCH_POLL_INTERVAL, use_events=WATCHDOG_AVAILABLE):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.use_events = use_events
+        self.mode = None
+        self.version = 0
+        self.events = collections.deque(maxlen=MAX_WATCH_EVENTS)
+        with use_repo_path(path):
+            repo = get_session().repo
+            self.git_dir = os.path.abspath(repo.git_dir)
+            self.common_dir = os.path.abspath(repo.common_dir)
+        self.refs_dir = os.path.join(self.common_dir, 'refs')
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self._snapshot = None
+        self._signature = None
+
+    def start(self):
+        """초기 상태를 읽고 감시를 시작"""
+        if self._thread is not None:
+            return
+        self._snapshot = self._take_snapshot()
+        self._signature = self._stat_signature()
+        if self.use_events:
+            try:
+                self._observer = self._start_observer()
+            except OSError:
+                self._observer = None  # inotify 감시 수 제한 등으로 실패하면 polling으로 대신한다
+        self.mode = WATCH_EVENTS if self._observer is not None else WATCH_POLLING
+        self._thread = threading.Thread(target=self._run, name=f'git-watch-{os.path.basename(self.path)}', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def subscribe(self, callback):
+        """변경마다 callback(change)를 감시 스레드에서 호출"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._listeners.remove(callback)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def changes_since(self, version):
+        """version 이후에 일어난 변경 목록 (오래된 것부터)"""
+        with self._lock:
+            return [change for change in self.events if change['version'] > version]
+
+    def is_watched_path(self, path):
+        if path.endswith('.lock'):
+            return False
+        directory, name = os.path.split(path)
+        if name in _WATCHED_FILES and directory in (self.git_dir, self.common_dir):
+            return True
+        return path.startswith(self.refs_dir + os.sep)
+
+    def _start_observer(self):
+        observer = Observer()
+        handler = _GitDirEventHandler(self)
+        observer.schedule(handler, self.git_dir, recursive=False)
+        if self.common_dir != self.git_dir:
+            observer.schedule(handler, self.common_dir, recursive=False)  # 워크트리의 packed-refs
+        observer.schedule(handler, self.refs_dir, recursive=True)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def _stat_signature(self):
+        """polling용: 감시 대상 파일과 느슨한 참조 파일들의 stat"""
+        files = [os.path.join(self.git_dir, 'HEAD'), os.path.join(self.git_dir, 'index'),
+                 os.path.join(self.common_dir, 'packed-refs')]
+        signature = [_stat_key(path) for path in files]
+        for directory, _, names in os.walk(self.refs_dir):
+            signature.extend((directory, name, _stat_key(os.path.join(directory, name)))
+                             for name in names if not name.endswith('.lock'))
+        return signature
+
+    def _take_snapshot(self):
+        with use_repo_path(self.path):
+            try:
+                with open(os.path.join(self.git_dir, 'HEAD'), encoding='utf-8') as f:
+                    head = f.read().strip()
+            except OSError:
+                head = None
+            return {
+                'head': head,
+                'refs': get_ref_shas(),
+                'index': _stat_key(os.path.join(self.git_dir, 'index'))
+            }
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._observer is None:
+                if self._stop.wait(self.poll_interval):
+                    break
+                signature = self._stat_signature()
+                if signature == self._signature:
+                    continue
+                self._signature = signature
+            else:
+                self._wakeup.wait()
+                if self._stop.wait(WATCH_DEBOUNCE):
+                    break
+                self._wakeup.clear()
+            try:
+                self.check()
+            except (git.exc.GitError, OSError) as e:
+                print(f"Failed to check repository changes in {self.path}: {e}")
+
+    def check(self):
+        """현재 상태를 이전 상태와 비교하여 변경이 있으면 반영하고 변경 내용을 반환 (없으면 None)"""
+        with span('watch: check', path=self.path) as trace:
+            snapshot = self._take_snapshot()
+            previous, self._snapshot = self._snapshot, snapshot
+            old_refs, new_refs = previous['refs'], snapshot['refs']
+            moved = [
+                (refname, old_refs.get(refname), new_refs.get(refname))
+                for refname in sorted(old_refs.keys() | new_refs.keys())
+                if old_refs.get(refname) != new_refs.get(refname)
+            ]
+            head = (previous['head'], snapshot['head']) if previous['head'] != snapshot['head'] else None
+            index_changed = previous['index'] != snapshot['index']
+            if not (moved or head or index_changed):
+                return None
+            trace.set(moved=len(moved))
+
+            # 움직인 참조가 있을 때만 커밋 그래프 캐시를 증분 갱신하고, 인덱스나 HEAD가 바뀌면 상태 캐시를 비운다
+            with use_repo_path(self.path):
+                if moved or head:
+                    get_commit_history()
+                if index_changed or head:
+                    clear_status_cache()
+
+            with self._lock:
+                self.version += 1
+                change = {
+                    'version': self.version,
+                    'time': time.time(),
+                    'head': head,
+                    'moved': moved,
+                    'index_changed': index_changed
+                }
+                self.events.append(change)
+                listeners = list(self._listeners)
+        for callback in listeners:
+            callback(change)
+        return change
+
+
+def get_watcher(path=None):
+    """리포지토리 감시자를 반환 (처음 요청할 때 시작하며 같은 리포지토리는 감시자를 공유한다)"""
+    path = path or get_current_repo_path()
+    with _watchers_lock:
+        watcher = _watchers.get(path)
+        if watcher is None:
+            watcher = _watchers[path] = RepositoryWatcher(path)
+            watcher.start()
+        return watcher
+
+
+def stop_watcher(path=None):
+    path = path or get_current_repo_path()
+    with _watchers_lock:
+        watcher = _watchers.pop(path, None)
+    if watcher is not None:
+        watcher.stop()
+
+
+def _short_ref(refname):
+    for prefix in ('refs/heads/', 'refs/remotes/', 'refs/tags/'):
+        if refname.startswith(prefix):
+            return refname[len(prefix):]
+    return refname
+
+
+def describe_change(change):
+    """변경 내용을 사람이 읽을 수 있는 문장 목록으로 변환"""
+    lines = []
+    if change['head']:
+        new_head = change['head'][1] or ''
+        target = _short_ref(new_head[len('ref: '):]) if new_head.startswith('ref: ') else f"{new_head[:7]} (detached)"
+        lines.append(f"HEAD → {target}")
+    for refname, old_sha, new_sha in change['moved']:
+        name = _short_ref(refname)
+        if old_sha is None:
+            lines.append(f"{name} created at {new_sha[:7]}")
+        elif new_sha is None:
+            lines.append(f"{name} deleted")
+        else:
+            lines.append(f"{name}: {old_sha[:7]} → {new_sha[:7]}")
+    if change['index_changed'] and not lines:
+        lines.append("Index updated")
+    return lines
@@ -0,0 +1,128 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from git_trace import git_span, traced
+
+# 워크스페이스 경로 목록 (os.pathsep으로 구분, 각 경로는 리포지토리 또는 리포지토리들을 담은 디렉토리)
+WORKSPACE_ENV = 'COMMIT_FRAME_WORKSPACE'
+
+# 리포지토리를 찾을 때 내려갈 최대 디렉토리 깊이
+MAX_DISCOVERY_DEPTH = 3
+
+# 동시에 검사할 리포지토리 수 (git 프로세스 대기가 대부분이므로 CPU 수보다 크게 둔다)
+MAX_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 리포지토리 하나를 검사할 때의 제한 시간 (초)
+SCAN_TIMEOUT = 30
+
+
+def _is_repository(path):
+    return os.path.exists(os.path.join(path, '.git'))
+
+
+def discover_repositories(paths, max_depth=MAX_DISCOVERY_DEPTH):
+    """경로 목록에서 Git 리포지토리를 찾아 정렬된 절대 경로 목록으로 반환
+
+    경로가 리포지토리면 그대로 쓰고, 아니면 max_depth까지 하위 디렉토리를 탐색한다.
+    리포지토리 안쪽과 숨김 디렉토리는 탐색하지 않는다.
+    """
+    found = set()
+    for root in paths:
+        root = os.path.abspath(os.path.expanduser(root))
+        if not os.path.isdir(root):
+            continue
+        pending = [(root, 0)]
+        while pending:
+            path, depth = pending.pop()
+            if _is_repository(path):
+                found.add(path)
+                continue
+            if depth >= max_depth:
+                continue
+            try:
+                entries = os.scandir(path)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'):
+                        pending.append((entry.path, depth + 1))
+    return sorted(found)
+
+
+def get_workspace_paths():
+    """환경 변수에 설정된 워크스페이스 경로 목록"""
+    value = os.environ.get(WORKSPACE_ENV, '')
+    return [p for p in value.split(os.pathsep) if p.strip()]
+
+
+def scan_repository(path):
+    """리포지토리 하나의 브랜치, HEAD, 변경 여부, upstream 대비 ahead/behind를 검사
+
+    `git status --porcelain=v2 --branch` 한 번으로 모든 정보를 읽는다.
+    """
+    status = {
+        'path': path,
+        'name': os.path.basename(path),
+        'branch': None,
+        'head': None,
+        'dirty': None,
+        'changes': 0,
+        'upstream': None,
+        'ahead': None,
+        'behind': None,
+        'error': None
+    }
+    cmd = ['git', 'status', '--porcelain=v2', '--branch', '-z']
+    try:
+        with git_span(cmd, repo=path):
+            result = subprocess.run(
+                cmd,
+                cwd=path,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                timeout=SCAN_TIMEOUT,
+            )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        status['error'] = str(e)
+        return status
+    if result.returncode != 0:
+        status['error'] = result.stderr.strip()
+        return status
+
+    changes = 0
+    entries = iter(result.stdout.split('\0'))
+    for entry in entries:
+        if entry.startswith('# branch.oid '):
+            oid = entry[len('# branch.oid '):]
+            status['head'] = None if oid == '(initial)' else oid[:7]
+        elif entry.startswith('# branch.head '):
+            head = entry[len('# branch.head '):]
+            status['branch'] = None if head == '(detached)' else head
+        elif entry.startswith('# branch.upstream '):
+            status['upstream'] = entry[len('# branch.upstream '):]
+        elif entry.startswith('# branch.ab '):
+            ahead, behind = entry[len('# branch.ab '):].split()
+            status['ahead'] = int(ahead)
+            status['behind'] = -int(behind)
+        elif entry.startswith('2 '):
+            # 이름 변경 항목은 원래 경로가 다음 필드로 따로 나온다
+            next(entries, None)
+            changes += 1
+        elif entry:
+            changes += 1
+    status['changes'] = changes
+    status['dirty'] = changes > 0
+    return status
+
+
+@traced(count=len)
+def scan_workspace(repo_paths, max_workers=MAX_SCAN_WORKERS):
+    """여러 리포지토리를 제한된 스레드 풀에서 동시에 검사하여 입력 순서대로 반환"""
+    if not repo_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(repo_paths))) as executor:
+        return list(executor.map(scan_repository, repo_paths))
@@ -1,17 +1,54 @@
+import json
+import os
+import time
 import streamlit as st
 import git
+from git_analytics import count_by_author, count_by_type, generate_changelog, load_commit_columns, weekly_throughput
+from git_graph import render_svg
+from git_jobs import cancel_job, has_running_jobs, list_jobs, submit_job
+from git_search import get_loaded_search_index, get_search_index, load_search_index_in_background
+from git_trace import (
+    CATEGORY_GIT,
+    CATEGORY_UI,
+    clear_spans,
+    export_chrome_trace,
+    get_spans,
+    is_tracing,
+    span,
+    summarize_spans,
+    traced,
+    tracing
+)
 from git_utils import (
+    HISTORY_PAGE_SIZE,
+    MAX_DECORATED_TAGS,
+    MERGE_CONFLICTS,
+    MERGE_ERROR,
+    MERGE_UP_TO_DATE,
+    REF_TYPE_PREFIXES,
+    clear_status_cache,
     commit_types,
     create_commit_message,
     execute_commit,
     execute_merge,
     execute_checkout,
     execute_create_branch,
+    execute_create_branches,
     execute_pull,
     execute_push,
-    get_git_graph_data,
-    repo_path
+    fetch_manager,
+    get_branch_status_overview,
+    get_current_repo_path,
+    get_git_graph_page,
+    get_git_refs,
+    get_graph_page_source,
+    get_working_tree_status,
+    get_session,
+    preview_merges,
+    use_repo_path
 )
+from git_watch import WATCH_EVENTS, describe_change, get_watcher
+from git_workspace import discover_repositories, get_workspace_paths, scan_workspace
 
 try:
     from graphviz import Digraph
@@ -19,7 +56,63 @@ try:
 except ImportError:
     GRAPHVIZ_AVAILABLE = False
 
-def render_git_graph(commit_data, refs):
+# Git 그래프 렌더러 옵션
+GRAPH_RENDERERS = ["Lanes (SVG)", "Graphviz"]
+
+# SVG 그래프 영역의 최대 높이 (넘치면 스크롤)
+GRAPH_MAX_HEIGHT = 800
+
+# 작업 트리 상태 문자별 이름
+FILE_STATUS_LABELS = {
+    'M': 'modified',
+    'A': 'added',
+    'D': 'deleted',
+    'R': 'renamed',
+    'C': 'copied',
+    'T': 'type changed',
+    'U': 'unmerged',
+    '?': 'untracked'
+}
+
+# 백그라운드 작업 상태를 다시 확인하는 간격 (초)
+JOB_POLL_INTERVAL = 1
+
+# 리포지토리 변경 알림을 확인하는 간격 (초, 감시 스레드의 상태만 읽으므로 git을 실행하지 않는다)
+WATCH_UI_INTERVAL = 1
+
+# 알림에 보여줄 최대 변경 줄 수
+MAX_WATCH_MESSAGE_LINES = 8
+
+# 작업 상태별 아이콘
+JOB_STATUS_ICONS = {
+    'succeeded': '✅',
+    'failed': '❌',
+    'cancelled': '🚫',
+    'timed out': '⏱️'
+}
+
+# 머지 미리보기 상태별 아이콘
+MERGE_STATUS_ICONS = {
+    MERGE_UP_TO_DATE: '➖',
+    MERGE_CONFLICTS: '⚠️',
+    MERGE_ERROR: '❌'
+}
+
+
+def render_git_graph(commit_data, refs, renderer=GRAPH_RENDERERS[0]):
+    """선택한 렌더러로 Git 그래프를 렌더링"""
+    if renderer == "Graphviz":
+        render_graphviz_graph(commit_data, refs)
+        return
+
+    with span('render_svg', CATEGORY_UI, count=len(commit_data)):
+        svg = render_svg(commit_data, refs)
+    with span('st.html', CATEGORY_UI, size=len(svg)):
+        st.html(f'<div style="max-height:{GRAPH_MAX_HEIGHT}px;overflow:auto;background:white">{svg}</div>')
+
+
+@traced(category=CATEGORY_UI)
+def render_graphviz_graph(commit_data, refs):
     """graphviz를 사용하여 Git 그래프를 렌더링"""
     if not GRAPHVIZ_AVAILABLE:
         st.warning("Graphviz is not installed. Please run `pip install graphviz` to see the visual git graph.")
@@ -39,6 +132,7 @@ def render_git_graph(commit_data, refs):
     dot.attr('edge', arrowhead='none')
 
     commit_nodes = set()
+    visible_shas = {c['sha'] for c in commit_data}
     for commit in commit_data:
         sha = commit['sha']
         short_sha = commit['short_sha']
@@ -75,14 +169,374 @@ def render_git_graph(commit_data, refs):
 
         # Edges to parents
         for parent_sha in commit['parents']:
-            if parent_sha in [c['sha'] for c in commit_data]:
+            if parent_sha in visible_shas:
                 dot.edge(parent_sha, sha)
 
-    st.graphviz_chart(dot, use_container_width=True)
+    with span('st.graphviz_chart', CATEGORY_UI, count=len(commit_nodes)):
+        st.graphviz_chart(dot, use_container_width=True)
+
+
+def load_history_window(refs):
+    """Git History에 표시할 커밋 윈도우를 세션 상태에서 관리
+
+    참조가 바뀌면 이미 불러온 만큼의 커밋을 다시 읽는다. 목록의 모든 윈도우는 첫 윈도우를 읽은 곳
+    (커밋 그래프 캐시 또는 git log)에서 읽어, 두 곳의 순서가 달라도 커밋이 빠지거나 겹치지 않게 한다.
+    """
+    if st.session_state.get('history_refs') != refs:
+        st.session_state.history_refs = refs
+        loaded = len(st.session_state.get('history_commits') or [])
+        st.session_state.history_commits = []
+        st.session_state.history_cursor = 0
+        st.session_state.history_source = get_graph_page_source()
+        if loaded > HISTORY_PAGE_SIZE:
+            commit_data, next_cursor = get_git_graph_page(0, loaded, st.session_state.history_source)
+            st.session_state.history_commits = commit_data
+            st.session_state.history_cursor = next_cursor
+
+    if not st.session_state.history_commits and st.session_state.history_cursor is not None:
+        load_next_history_window()
+
+    return st.session_state.history_commits, st.session_state.history_cursor
+
+
+def load_next_history_window():
+    """다음 커밋 윈도우를 읽어 세션 상태에 추가"""
+    commit_data, next_cursor = get_git_graph_page(
+        st.session_state.history_cursor, HISTORY_PAGE_SIZE, st.session_state.history_source
+    )
+    st.session_state.history_commits = st.session_state.history_commits + commit_data
+    st.session_state.history_cursor = next_cursor
+
+
+def render_ref_filters():
+    """그래프에 표시할 참조 필터 입력란을 그리고 get_git_refs 인자를 반환"""
+    with st.expander("🏷️ Reference Filters"):
+        ref_types = st.multiselect("Reference types", list(REF_TYPE_PREFIXES), default=list(REF_TYPE_PREFIXES))
+        col1, col2 = st.columns(2)
+        include = col1.text_input("Include", placeholder="e.g. main, release/*, v2.*")
+        exclude = col2.text_input("Exclude", placeholder="e.g. origin/*, dependabot/*")
+        max_tags = st.number_input("Maximum tags", min_value=0, value=MAX_DECORATED_TAGS, step=100,
+                                   help="Only the highest version tags are shown. 0 shows all tags.")
+
+    def patterns(text):
+        return [p.strip() for p in text.split(',') if p.strip()]
+
+    return {
+        'ref_types': ref_types,
+        'include': patterns(include),
+        'exclude': patterns(exclude),
+        'max_tags': int(max_tags)
+    }
+
+
+def render_commit_search():
+    """커밋 검색 입력란을 그리고, 조건이 있으면 결과를 표시한 뒤 True를 반환
+
+    인덱스는 검색 조건이 있을 때만 갱신하고, 아직 없으면 히스토리 윈도우를 막지 않도록 백그라운드에서 만든다.
+    타입/작성자 선택지는 메모리에 있는 인덱스에서 읽는다.
+    """
+    index = get_loaded_search_index()
+    if index is None:
+        load_search_index_in_background()
+
+    with st.expander("🔍 Search Commits", expanded=bool(st.session_state.get('search_query'))):
+        query = st.text_input("Search", key='search_query', placeholder="Words in the title or body")
+        col1, col2 = st.columns(2)
+        types = col1.multiselect("Type", sorted(set(commit_types) | set(index.known_types() if index else ())))
+        authors = col2.multiselect(
+            "Author", index.known_authors() if index else [],
+            help=None if index else "Authors appear once the search index is loaded."
+        )
+        use_dates = st.checkbox("Filter by date")
+        date_range = st.date_input("Date range", value=()) if use_dates else ()
+
+    since = until = None
+    if len(date_range) == 2:
+        since, until = (d.isoformat() for d in date_range)
+    if not (query.strip() or types or authors or since):
+        return False
+
+    try:
+        index = get_search_index()
+    except Exception as e:
+        st.error(f"Failed to build the search index: {e}")
+        return False
+    results = index.search(query, types, authors, since, until)
+    st.caption(f"{len(results)} matching commits (indexed {len(index)}).")
+    if results:
+        st.dataframe(
+            [{key: r[key] for key in ('short_sha', 'type', 'message', 'author', 'date')} for r in results],
+            hide_index=True
+        )
+    return True
+
+
+def describe_file_status(entry):
+    """작업 트리 상태 항목을 사람이 읽을 수 있는 문자열로 변환"""
+    if entry['index'] == '?':
+        return FILE_STATUS_LABELS['?']
+    parts = []
+    if entry['index'] != '.':
+        label = FILE_STATUS_LABELS.get(entry['index'], entry['index'])
+        if entry['orig_path']:
+            label = f"{label} from {entry['orig_path']}"
+        parts.append(f"{label} (staged)")
+    if entry['worktree'] != '.' and entry['worktree'] != entry['index']:
+        parts.append(FILE_STATUS_LABELS.get(entry['worktree'], entry['worktree']))
+    return ', '.join(parts)
+
+
+def start_job(description, success_message, func, *args, worktree=True):
+    """git 작업을 백그라운드로 시작하고 완료 시 보여줄 메시지를 기록"""
+    job_id = submit_job(description, func, *args, worktree=worktree)
+    st.session_state.setdefault('job_messages', {})[job_id] = success_message
+    st.session_state.setdefault('watched_jobs', set()).add(job_id)
+
+
+def render_job_panel():
+    """백그라운드 작업 상태를 표시하고, 지켜보던 작업이 끝나면 앱 전체를 다시 실행"""
+    jobs = list_jobs()
+    if not jobs:
+        return
+
+    st.header("Jobs")
+    watched = st.session_state.setdefault('watched_jobs', set())
+    job_messages = st.session_state.setdefault('job_messages', {})
+    finished_jobs = []
+    show_repo = bool(st.session_state.get('workspace_repos'))
+    for job in jobs:
+        description = job.description
+        if show_repo:
+            description = f"{description} ({os.path.basename(job.repo_path)})"
+        if not job.finished:
+            label = f"{description}: {job.stage or job.status}"
+            st.progress(job.progress or 0.0, text=label)
+            if st.button("Cancel", key=f"cancel_job_{job.id}"):
+                cancel_job(job.id)
+        else:
+            icon = JOB_STATUS_ICONS.get(job.status, '')
+            st.caption(f"{icon} {description} ({job.status})")
+            if job.id in watched:
+                watched.discard(job.id)
+                finished_jobs.append(job)
+
+    if finished_jobs:
+        for job in finished_jobs:
+            if job.status == 'succeeded':
+                st.session_state.success_message = job_messages.pop(job.id, f"{job.description} finished.")
+            else:
+                job_messages.pop(job.id, None)
+                st.session_state.error_message = job.error or f"{job.description} was {job.status}."
+        st.rerun()
+
+
+def render_live_refresh(watcher):
+    """감시자가 새 변경을 알리면 변경 내용을 기록하고 앱 전체를 다시 실행
+
+    감시 스레드가 커밋 그래프 캐시를 이미 증분 갱신했으므로, 다시 실행할 때 전체 이력을 다시 읽지는 않는다.
+    """
+    key = f"watch_version_{watcher.path}"
+    seen = st.session_state.setdefault(key, watcher.version)
+    mode = "file system events" if watcher.mode == WATCH_EVENTS else f"polling every {watcher.poll_interval:g}s"
+    st.caption(f"Watching HEAD, refs and index ({mode}).")
+    if watcher.version == seen:
+        return
+
+    st.session_state[key] = watcher.version
+    lines = [line for change in watcher.changes_since(seen) for line in describe_change(change)]
+    if len(lines) > MAX_WATCH_MESSAGE_LINES:
+        lines = lines[:MAX_WATCH_MESSAGE_LINES] + [f"... and {len(lines) - MAX_WATCH_MESSAGE_LINES} more"]
+    st.session_state.watch_message = '\n'.join(lines)
+    st.rerun(scope='app')
+
+
+def select_workspace_repo():
+    """사이드바에서 워크스페이스 리포지토리를 선택하여 (작업 대상 경로, 워크스페이스 리포지토리 목록)을 반환"""
+    st.sidebar.header("Workspace")
+    default_paths = st.session_state.get('workspace_paths_text', '\n'.join(get_workspace_paths()))
+    paths_text = st.sidebar.text_area(
+        "Workspace roots or repositories (one per line)",
+        value=default_paths,
+        help="Leave empty to work on the current directory only."
+    )
+    if paths_text != st.session_state.get('workspace_paths_text'):
+        st.session_state.workspace_paths_text = paths_text
+        st.session_state.workspace_repos = discover_repositories(paths_text.splitlines())
+        st.session_state.workspace_scan = None
+
+    workspace_repos = st.session_state.get('workspace_repos') or []
+    if not workspace_repos:
+        return get_current_repo_path(), []
+
+    selected = st.sidebar.selectbox(
+        "Target Repository",
+        workspace_repos,
+        format_func=os.path.basename,
+        key='workspace_target'
+    )
+    return selected, workspace_repos
+
+
+def render_workspace_dashboard(workspace_repos):
+    """워크스페이스의 모든 리포지토리 상태를 한 표로 보여줌"""
+    st.subheader("Workspace status")
+    if not workspace_repos:
+        st.info("Add workspace roots or repositories in the sidebar to scan them together.")
+        return
+
+    if st.button("🔄 Rescan") or st.session_state.get('workspace_scan') is None:
+        started = time.perf_counter()
+        st.session_state.workspace_scan = scan_workspace(workspace_repos)
+        st.session_state.workspace_scan_time = time.perf_counter() - started
+
+    scan = st.session_state.workspace_scan
+    st.caption(f"Scanned {len(scan)} repositories in {st.session_state.workspace_scan_time:.2f}s.")
+    st.dataframe(
+        [
+            {
+                'Repository': s['name'],
+                'Branch': s['branch'] or '(detached)',
+                'HEAD': s['head'],
+                'Dirty': s['dirty'],
+                'Changes': s['changes'],
+                'Upstream': s['upstream'] or '-',
+                'Ahead': s['ahead'],
+                'Behind': s['behind'],
+                'Error': s['error'] or '',
+                'Path': s['path']
+            }
+            for s in scan
+        ],
+        hide_index=True
+    )
+
+
+def render_changelog_page():
+    """리비전 범위의 커밋을 타입, 작성자, 주 단위로 집계하여 변경 로그와 차트를 보여줌"""
+    st.subheader("Changelog and commit analytics")
+    col1, col2 = st.columns([3, 1])
+    revision_range = col1.text_input("Revision range", value="HEAD", help="e.g. `v1.0..v2.0`, `main`, `--all`")
+    include_merges = col2.checkbox("Include merges")
+
+    if st.button("📊 Analyze"):
+        started = time.perf_counter()
+        try:
+            st.session_state.changelog_columns = load_commit_columns(revision_range, include_merges)
+        except git.exc.GitCommandError as e:
+            st.error(f"Failed to read commits in `{revision_range}`: {e.stderr.strip()}")
+            return
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.session_state.changelog_range = revision_range
+        st.session_state.changelog_time = time.perf_counter() - started
+
+    columns = st.session_state.get('changelog_columns')
+    if columns is None:
+        st.info("Enter a revision range and press Analyze.")
+        return
+    if not len(columns):
+        st.info("No commits in this range.")
+        return
+
+    revision_range = st.session_state.changelog_range
+    st.caption(
+        f"Loaded {len(columns)} commits in `{revision_range}` in {st.session_state.changelog_time:.2f}s "
+        f"({columns.nbytes / (1 << 20):.1f} MiB)."
+    )
+
+    week_starts, type_names, matrix = weekly_throughput(columns)
+    st.markdown("#### Weekly throughput")
+    chart_data = {'Week': week_starts}
+    chart_data.update({name: matrix[:, i] for i, name in enumerate(type_names)})
+    st.bar_chart(chart_data, x='Week', y=type_names)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### By type")
+        st.dataframe(
+            [{'Type': name, 'Commits': count} for name, count in count_by_type(columns).items()],
+            hide_index=True
+        )
+    with col2:
+        st.markdown("#### Top authors")
+        st.dataframe(
+            [{'Author': name, 'Commits': count} for name, count in count_by_author(columns, limit=20)],
+            hide_index=True
+        )
+
+    changelog = generate_changelog(columns, title=f"Changelog ({revision_range})")
+    st.markdown("#### Changelog")
+    st.download_button("⬇️ Download CHANGELOG.md", changelog, file_name="CHANGELOG.md", mime="text/markdown")
+    with st.container(height=500):
+        st.markdown(changelog)
+
+
+def render_trace_panel(since_ns):
+    """이번 실행에서 기록된 span을 사이드바 디버그 패널에 표시"""
+    with st.sidebar:
+        st.markdown("---")
+        enabled = st.checkbox(
+            "🐞 Debug timing",
+            value=is_tracing(),
+            key='trace_enabled',
+            help="Record git commands, git_utils operations and page phases with their durations."
+        )
+        if not enabled:
+            return
+
+        spans = get_spans(since_ns)
+        with st.expander("Timing (this run)", expanded=True):
+            if not spans:
+                st.caption("Spans are recorded from the next run.")
+            st.dataframe(
+                [
+                    {
+                        'Name': e['name'],
+                        'Kind': e['category'],
+                        'Calls': e['calls'],
+                        'Total (ms)': round(e['total'] * 1000, 1),
+                        'Max (ms)': round(e['max'] * 1000, 1)
+                    }
+                    for e in summarize_spans(spans)
+                ],
+                hide_index=True
+            )
+            git_spans = sorted((s for s in spans if s.category == CATEGORY_GIT), key=lambda s: s.duration, reverse=True)
+            if git_spans:
+                st.markdown("**Slowest git commands**")
+                st.dataframe(
+                    [
+                        {
+                            'Command': s.args.get('command', s.name),
+                            'ms': round(s.duration * 1000, 1),
+                            'Count': s.args.get('count')
+                        }
+                        for s in git_spans[:20]
+                    ],
+                    hide_index=True
+                )
+            st.download_button(
+                "⬇️ Chrome trace (JSON)",
+                json.dumps(export_chrome_trace()),
+                file_name="commit-frame-trace.json",
+                mime="application/json",
+                help="Open in chrome://tracing or https://ui.perfetto.dev"
+            )
+            if st.button("Clear recorded spans"):
+                clear_spans()
 
 
 def main():
     st.set_page_config(page_title="Git Tool", layout="wide")
+    # 추적 설정은 이 세션의 실행 스레드에만 적용한다 (다른 탭의 설정을 바꾸지 않는다)
+    with tracing(st.session_state.get('trace_enabled', is_tracing())):
+        render_page()
+
+
+def render_page():
+    """메시지, 제목, 작업 대상 리포지토리 화면을 그림"""
+    run_started_ns = time.perf_counter_ns()
 
     # Display session messages
     if 'success_message' in st.session_state and st.session_state.success_message:
@@ -91,199 +545,378 @@ def main():
     if 'error_message' in st.session_state and st.session_state.error_message:
         st.error(st.session_state.error_message)
         st.session_state.error_message = None
+    if st.session_state.get('watch_message'):
+        st.toast(st.session_state.watch_message, icon="🔄")
+        st.session_state.watch_message = None
 
     # Title
     st.title("Git Commit/Merge Formatter")
 
-    try:
-        repo = git.Repo(repo_path)
-        branches = [b.name for b in repo.branches]
-        current_branch_obj = repo.active_branch
-        current_branch = current_branch_obj.name
-    except git.InvalidGitRepositoryError:
-        st.error("This is not a Git repository. Please run this tool in a valid Git repository.")
-        return
-    except Exception as e:
-        st.error(f"An error occurred while reading the repository: {e}")
-        return
+    # 작업 대상은 이 실행 스레드에만 설정한다 (브라우저 탭마다 다른 리포지토리를 선택할 수 있다)
+    selected_repo, workspace_repos = select_workspace_repo()
+    if workspace_repos:
+        st.sidebar.markdown("---")
+    with use_repo_path(selected_repo):
+        render_repository_page(workspace_repos, run_started_ns)
+
+
+def render_repository_page(workspace_repos, run_started_ns):
+    """선택한 리포지토리의 사이드바 상태와 작업 화면을 그림"""
+    with span('page: read repository', CATEGORY_UI):
+        try:
+            session = get_session()
+            with session.lock:
+                repo = session.repo
+                branches = [b.name for b in repo.branches]
+                current_branch_obj = repo.active_branch
+                current_branch = current_branch_obj.name
+                local_sha = current_branch_obj.commit.hexsha
+        except git.InvalidGitRepositoryError:
+            st.error("This is not a Git repository. Please run this tool in a valid Git repository.")
+            return
+        except Exception as e:
+            st.error(f"An error occurred while reading the repository: {e}")
+            return
 
     # Sidebar
-    st.sidebar.header("Actions")
-    action_type = st.sidebar.selectbox(
-        "Select Action",
-        ["Git History", "Commit", "Merge", "Create Branch", "Pull", "Push", "Checkout Branch"]
-    )
-    st.sidebar.markdown("---")
-    st.sidebar.header("Current Status")
+    with span('page: sidebar', CATEGORY_UI):
+        st.sidebar.header("Actions")
+        action_type = st.sidebar.selectbox(
+            "Select Action",
+            ["Git History", "Commit", "Merge", "Create Branch", "Pull", "Push", "Checkout Branch", "Workspace", "Changelog"]
+        )
+        st.sidebar.markdown("---")
+        st.sidebar.header("Current Status")
     
-    # Refresh button in Current Status section
-    if st.sidebar.button("🔄 Refresh Status", help="Refresh the app state"):
-        st.rerun()
+        # Refresh button in Current Status section
+        if st.sidebar.button("🔄 Refresh Status", help="Refresh the app state"):
+            clear_status_cache()
+            st.rerun()
+        live_refresh = st.sidebar.checkbox(
+            "Live refresh",
+            value=True,
+            help="Watch HEAD, refs and the index and update the page after an external commit, checkout or fetch.",
+            key=f"live_refresh_{session.path}"
+        )
+        if live_refresh:
+            try:
+                watcher = get_watcher(session.path)
+            except Exception as e:
+                st.sidebar.caption(f"Live refresh unavailable: {e}")
+            else:
+                with st.sidebar:
+                    st.fragment(run_every=WATCH_UI_INTERVAL)(render_live_refresh)(watcher)
     
-    st.sidebar.info(f"**Current Branch:** `{current_branch}`")
+        st.sidebar.info(f"**Current Branch:** `{current_branch}`")
 
-    # Local and remote branch status
-    local_commit = current_branch_obj.commit
-    st.sidebar.markdown(f"**Local HEAD:** `{local_commit.hexsha[:7]}`")
+        # Local and remote branch status
+        st.sidebar.markdown(f"**Local HEAD:** `{local_sha[:7]}`")
 
-    remote_status_text = "No tracking remote branch."
-    tracking_branch = current_branch_obj.tracking_branch()
-    if tracking_branch:
+        remote_status_text = "No tracking remote branch."
         try:
-            remote_commit = tracking_branch.commit
-            if local_commit.hexsha == remote_commit.hexsha:
-                remote_status_text = f"Up to date with `{tracking_branch.name}`."
+            branch_overview = get_branch_status_overview()
+        except Exception:
+            branch_overview = []
+        current_status = next((b for b in branch_overview if b['branch'] == current_branch), None)
+        if current_status and current_status['upstream']:
+            tracking_name = current_status['upstream']
+            if current_status['ahead'] is None:
+                remote_status_text = f"Could not get status for `{tracking_name}`."
+            elif current_status['sha'] == current_status['upstream_sha']:
+                remote_status_text = f"Up to date with `{tracking_name}`."
             else:
-                ahead_count = sum(1 for _ in repo.iter_commits(f'{tracking_branch.name}..{current_branch_obj.name}'))
-                behind_count = sum(1 for _ in repo.iter_commits(f'{current_branch_obj.name}..{tracking_branch.name}'))
-                
                 status_parts = []
-                if ahead_count > 0:
-                    status_parts.append(f"{ahead_count} ahead")
-                if behind_count > 0:
-                    status_parts.append(f"{behind_count} behind")
+                if current_status['ahead'] > 0:
+                    status_parts.append(f"{current_status['ahead']} ahead")
+                if current_status['behind'] > 0:
+                    status_parts.append(f"{current_status['behind']} behind")
 
                 if status_parts:
-                    remote_status_text = f"[{', '.join(status_parts)}] of `{tracking_branch.name}`"
+                    remote_status_text = f"[{', '.join(status_parts)}] of `{tracking_name}`"
                 else: # Diverged or other state
-                    remote_status_text = f"Diverged from `{tracking_branch.name}`"
+                    remote_status_text = f"Diverged from `{tracking_name}`"
+        st.sidebar.markdown(f"**Remote Status:** {remote_status_text}")
 
-        except Exception:
-            remote_status_text = f"Could not get status for `{tracking_branch.name}`."
-    st.sidebar.markdown(f"**Remote Status:** {remote_status_text}")
+        # Fetch freshness and background prefetch
+        fetch_age = fetch_manager.last_fetch_age()
+        if fetch_age is None:
+            st.sidebar.caption("Not fetched yet in this session.")
+        else:
+            st.sidebar.caption(f"Last fetch: {fetch_age:.0f}s ago (reused for {fetch_manager.ttl:.0f}s).")
+        prefetch = st.sidebar.checkbox(
+            "Background prefetch",
+            value=fetch_manager.is_prefetching(),
+            help=f"Fetch all remotes every {fetch_manager.prefetch_interval:.0f}s so merge and pull start with fresh refs.",
+            key=f"prefetch_{session.path}"
+        )
+        if prefetch != fetch_manager.is_prefetching():
+            fetch_manager.set_prefetch(prefetch)
+
+        # All local branches against their upstreams
+        with st.sidebar.expander("Branch Overview"):
+            if branch_overview:
+                st.dataframe(
+                    [
+                        {
+                            'Branch': b['branch'],
+                            'Upstream': b['upstream'] or '-',
+                            'Ahead': b['ahead'],
+                            'Behind': b['behind']
+                        }
+                        for b in branch_overview
+                    ],
+                    hide_index=True
+                )
+            else:
+                st.markdown("_No local branches._")
     
+    # Background jobs (polled while any job is running)
+    with st.sidebar:
+        st.markdown("---")
+        run_every = JOB_POLL_INTERVAL if has_running_jobs() else None
+        with span('page: jobs panel', CATEGORY_UI):
+            st.fragment(run_every=run_every)(render_job_panel)()
+
     # Main action handling
-    st.markdown("---")
-    st.header(f"Action: {action_type}")
-
-    if action_type == "Git History":
-        st.markdown("## Git Graph")
-        commit_data, refs = get_git_graph_data()
-        if commit_data:
-            render_git_graph(commit_data, refs)
-
-            st.markdown("---")
-            st.markdown("### Commit Details")
-            st.info("Click on a commit to see its body.")
-
-            # Create a reverse mapping from sha to a list of ref names
-            sha_to_refs = {}
-            for ref_name, ref_info in refs.items():
-                sha = ref_info['sha']
-                if sha not in sha_to_refs:
-                    sha_to_refs[sha] = []
-                sha_to_refs[sha].append(ref_name)
+    with span(f'page: {action_type}', CATEGORY_UI):
+        st.markdown("---")
+        st.header(f"Action: {action_type}")
+
+        if action_type == "Git History":
+            st.markdown("## Git Graph")
+            ref_filters = render_ref_filters()
+            try:
+                refs = get_git_refs(**ref_filters)
+            except Exception as e:
+                st.error(f"Failed to read references: {e}")
+                refs = {}
+            if not render_commit_search():
+                commit_data, next_cursor = load_history_window(refs)
+                if commit_data:
+                    renderer = st.radio("Graph renderer", GRAPH_RENDERERS, horizontal=True)
+                    render_git_graph(commit_data, refs, renderer)
+
+                    st.caption(f"Showing the {len(commit_data)} most recent commits.")
+                    if next_cursor is not None and st.button("⬇️ Load more commits"):
+                        load_next_history_window()
+                        st.rerun()
+
+                    st.markdown("---")
+                    st.markdown("### Commit Details")
+                    st.info("Click on a commit to see its body.")
+
+                    # Create a reverse mapping from sha to a list of ref names
+                    sha_to_refs = {}
+                    for ref_name, ref_info in refs.items():
+                        sha = ref_info['sha']
+                        if sha not in sha_to_refs:
+                            sha_to_refs[sha] = []
+                        sha_to_refs[sha].append(ref_name)
             
-            for commit in commit_data:
-                # Build the summary string for the expander title
-                summary_parts = []
-                commit_refs = sha_to_refs.get(commit['sha'], [])
-                if commit_refs:
-                    summary_parts.append(f"📍 {', '.join(commit_refs)}")
+                    for commit in commit_data:
+                        # Build the summary string for the expander title
+                        summary_parts = []
+                        commit_refs = sha_to_refs.get(commit['sha'], [])
+                        if commit_refs:
+                            summary_parts.append(f"📍 {', '.join(commit_refs)}")
                 
-                summary_parts.append(f"👤 {commit['author']}")
-                summary_parts.append(f"📅 {commit['date']}")
+                        summary_parts.append(f"👤 {commit['author']}")
+                        summary_parts.append(f"📅 {commit['date']}")
                 
-                summary_str = f"({'; '.join(summary_parts)})"
-                expander_title = f"{commit['short_sha']} - {commit['message']} {summary_str}"
-
-                with st.expander(expander_title):
-                    st.markdown(f"**Author:** {commit['author']}")
-                    st.markdown(f"**Date:** {commit['date']}")
-                    st.markdown(f"**SHA:** {commit['sha']}")
-                    st.markdown(f"**Refs:** `{', '.join(commit_refs)}`" if commit_refs else "_No refs pointing to this commit._")
-                    st.markdown("**Body:**")
-                    if commit.get('body'):
-                        st.code(commit['body'], language='text')
-                    else:
-                        st.markdown("_This commit has no body._")
-        else:
-            st.info("No commits in the repository yet.")
-
-    elif action_type == "Commit":
-        st.subheader("Create a new commit")
-        commit_type = st.selectbox("Commit Type", commit_types)
-        commit_title = st.text_input("Commit Title")
-        commit_description = st.text_area("Commit Description", height=200)
-        
-        if st.button("Execute Commit"):
-            if not commit_title:
-                st.warning("Commit title is required.")
-            else:
-                commit_message = create_commit_message(commit_type, commit_title, commit_description)
-                error = execute_commit(commit_message)
-                if error:
-                    st.session_state.error_message = error
+                        summary_str = f"({'; '.join(summary_parts)})"
+                        expander_title = f"{commit['short_sha']} - {commit['message']} {summary_str}"
+
+                        with st.expander(expander_title):
+                            st.markdown(f"**Author:** {commit['author']}")
+                            st.markdown(f"**Date:** {commit['date']}")
+                            st.markdown(f"**SHA:** {commit['sha']}")
+                            st.markdown(f"**Refs:** `{', '.join(commit_refs)}`" if commit_refs else "_No refs pointing to this commit._")
+                            st.markdown("**Body:**")
+                            if commit.get('body'):
+                                st.code(commit['body'], language='text')
+                            else:
+                                st.markdown("_This commit has no body._")
                 else:
-                    st.session_state.success_message = "Commit successful!"
-                st.rerun()
-
-    elif action_type == "Merge":
-        st.subheader("Merge branches")
-        target_branch = st.selectbox("Target Branch (into which you merge)", branches, index=branches.index(current_branch))
-        source_branch = st.selectbox("Source Branch (which you merge)", [b for b in branches if b != target_branch])
-
-        if st.button("Execute Merge"):
-            error = execute_merge(source_branch, target_branch)
-            if error:
-                st.session_state.error_message = error
+                    st.info("No commits in the repository yet.")
+
+        elif action_type == "Commit":
+            st.subheader("Create a new commit")
+            commit_type = st.selectbox("Commit Type", commit_types)
+            commit_title = st.text_input("Commit Title")
+            commit_description = st.text_area("Commit Description", height=200)
+
+            st.markdown("#### Changed Files")
+            try:
+                changes = get_working_tree_status()
+            except Exception as e:
+                st.error(f"Failed to read working tree status: {e}")
+                changes = []
+            selected_paths = []
+            if changes:
+                edited_rows = st.data_editor(
+                    [
+                        {'Commit': True, 'Status': describe_file_status(entry), 'Path': entry['path']}
+                        for entry in changes
+                    ],
+                    column_config={'Commit': st.column_config.CheckboxColumn(help="Stage and commit this file")},
+                    disabled=['Status', 'Path'],
+                    hide_index=True,
+                    key='commit_file_selection'
+                )
+                selected_paths = [row['Path'] for row in edited_rows if row['Commit']]
+                st.caption(f"{len(selected_paths)} of {len(changes)} changed files selected.")
             else:
-                st.session_state.success_message = f"Successfully merged `{source_branch}` into `{target_branch}`!"
-            st.rerun()
+                st.info("No changes detected in the working tree.")
 
-    elif action_type == "Create Branch":
-        st.subheader("Create a new branch")
-        base_branch = st.selectbox("Base Branch", branches, index=branches.index(current_branch))
-        new_branch_name = st.text_input("New Branch Name")
-
-        if st.button("Create Branch"):
-            if not new_branch_name:
-                st.warning("New branch name is required.")
-            else:
-                error = execute_create_branch(new_branch_name, base_branch)
-                if error:
-                    st.session_state.error_message = error
+            if st.button("Execute Commit"):
+                if not commit_title:
+                    st.warning("Commit title is required.")
                 else:
-                    st.session_state.success_message = f"Branch `{new_branch_name}` created successfully from `{base_branch}`!"
+                    commit_message = create_commit_message(commit_type, commit_title, commit_description)
+                    error = execute_commit(commit_message, selected_paths)
+                    if error:
+                        st.session_state.error_message = error
+                    else:
+                        st.session_state.success_message = "Commit successful!"
+                    st.rerun()
+
+        elif action_type == "Merge":
+            st.subheader("Merge branches")
+            target_branch = st.selectbox("Target Branch (into which you merge)", branches, index=branches.index(current_branch))
+            source_candidates = [b for b in branches if b != target_branch]
+
+            # 모든 후보 브랜치의 머지 결과를 작업 트리 없이 미리 계산 (커밋 쌍별로 캐시됨)
+            with st.spinner("Previewing merges..."):
+                try:
+                    previews = {p['source']: p for p in preview_merges(source_candidates, target_branch)}
+                except Exception as e:
+                    st.error(f"Failed to preview merges: {e}")
+                    previews = {}
+
+            def describe_source(branch):
+                preview = previews.get(branch)
+                if preview is None:
+                    return branch
+                return f"{MERGE_STATUS_ICONS.get(preview['status'], '✅')} {branch} ({preview['status']})"
+
+            source_branch = st.selectbox("Source Branch (which you merge)", source_candidates, format_func=describe_source)
+
+            preview = previews.get(source_branch)
+            if preview:
+                if preview['status'] == MERGE_CONFLICTS:
+                    st.warning(f"Merging `{source_branch}` into `{target_branch}` conflicts in {len(preview['conflicts'])} files:")
+                    st.code('\n'.join(preview['messages'] or preview['conflicts']), language='text')
+                elif preview['status'] == MERGE_UP_TO_DATE:
+                    st.info(f"`{target_branch}` already contains every commit of `{source_branch}`.")
+                elif preview['status'] == MERGE_ERROR:
+                    st.error(f"Could not preview the merge: {preview['error']}")
+                else:
+                    st.success(f"`{source_branch}` merges cleanly into `{target_branch}` ({preview['commits']} commits).")
+
+            if previews:
+                with st.expander(f"Merge preview for all branches into `{target_branch}`"):
+                    st.dataframe(
+                        [
+                            {
+                                'Source': p['source'],
+                                'Status': p['status'],
+                                'Commits': p['commits'],
+                                'Conflicts': len(p['conflicts']),
+                                'Conflicting files': ', '.join(p['conflicts'])
+                            }
+                            for p in previews.values()
+                        ],
+                        hide_index=True
+                    )
+
+            if st.button("Execute Merge"):
+                start_job(
+                    f"Merge `{source_branch}` into `{target_branch}`",
+                    f"Successfully merged `{source_branch}` into `{target_branch}`!",
+                    execute_merge, source_branch, target_branch
+                )
                 st.rerun()
 
-    elif action_type == "Pull":
-        st.subheader("Pull changes from remote")
-        pull_branch = st.selectbox("Branch to pull", branches, index=branches.index(current_branch))
-        
-        if st.button("Execute Pull"):
-            with st.spinner(f"Pulling changes for `{pull_branch}`..."):
-                error = execute_pull(pull_branch)
-                if error:
-                    st.session_state.error_message = error
+        elif action_type == "Create Branch":
+            st.subheader("Create a new branch")
+            base_branch = st.selectbox("Base Branch", branches, index=branches.index(current_branch))
+            new_branch_names = [
+                name.strip() for name in
+                st.text_area("New Branch Names", height=100, help="One branch name per line.").splitlines()
+                if name.strip()
+            ]
+            switch_to_branch = st.checkbox(
+                "Switch to the new branch",
+                disabled=len(new_branch_names) > 1,
+                help="Branches are created without a checkout unless this is selected."
+            )
+
+            if st.button("Create Branch"):
+                if not new_branch_names:
+                    st.warning("New branch name is required.")
                 else:
-                    st.session_state.success_message = f"Successfully pulled changes for `{pull_branch}`!"
+                    if len(new_branch_names) == 1:
+                        error = execute_create_branch(new_branch_names[0], base_branch, checkout=switch_to_branch)
+                    else:
+                        error = execute_create_branches(new_branch_names, base_branch)
+                    if error:
+                        st.session_state.error_message = error
+                    else:
+                        created = ', '.join(f"`{name}`" for name in new_branch_names)
+                        label = "Branch" if len(new_branch_names) == 1 else "Branches"
+                        st.session_state.success_message = f"{label} {created} created successfully from `{base_branch}`!"
+                    st.rerun()
+
+        elif action_type == "Pull":
+            st.subheader("Pull changes from remote")
+            pull_branch = st.selectbox("Branch to pull", branches, index=branches.index(current_branch))
+            if pull_branch != current_branch:
+                st.caption(f"`{pull_branch}` is not checked out, so it is fast-forwarded to `origin/{pull_branch}` without a checkout.")
+
+            if st.button("Execute Pull"):
+                start_job(
+                    f"Pull `{pull_branch}`",
+                    f"Successfully pulled changes for `{pull_branch}`!",
+                    execute_pull, pull_branch
+                )
                 st.rerun()
 
-    elif action_type == "Push":
-        st.subheader("Push changes to remote")
-        push_branch = st.selectbox("Branch to push", branches, index=branches.index(current_branch))
+        elif action_type == "Push":
+            st.subheader("Push changes to remote")
+            push_branches = st.multiselect("Branches to push", branches, default=[current_branch])
 
-        if st.button("Execute Push"):
-            with st.spinner(f"Pushing changes for `{push_branch}`..."):
-                error = execute_push(push_branch)
+            if st.button("Execute Push"):
+                if not push_branches:
+                    st.warning("Select at least one branch to push.")
+                else:
+                    pushed = ', '.join(f"`{branch}`" for branch in push_branches)
+                    start_job(
+                        f"Push {pushed}",
+                        f"Successfully pushed changes for {pushed}!",
+                        execute_push, push_branches,
+                        worktree=False
+                    )
+                    st.rerun()
+
+        elif action_type == "Workspace":
+            render_workspace_dashboard(workspace_repos)
+
+        elif action_type == "Changelog":
+            render_changelog_page()
+
+        elif action_type == "Checkout Branch":
+            st.subheader("Switch to a different branch")
+            checkout_branch = st.selectbox("Select Branch to Checkout", [b for b in branches if b != current_branch])
+
+            if st.button("Checkout"):
+                error = execute_checkout(checkout_branch)
                 if error:
                     st.session_state.error_message = error
                 else:
-                    st.session_state.success_message = f"Successfully pushed changes for `{push_branch}`!"
+                    st.session_state.success_message = f"Switched to branch `{checkout_branch}`."
                 st.rerun()
 
-    elif action_type == "Checkout Branch":
-        st.subheader("Switch to a different branch")
-        checkout_branch = st.selectbox("Select Branch to Checkout", [b for b in branches if b != current_branch])
-
-        if st.button("Checkout"):
-            error = execute_checkout(checkout_branch)
-            if error:
-                st.session_state.error_message = error
-            else:
-                st.session_state.success_message = f"Switched to branch `{checkout_branch}`."
-            st.rerun()
+    render_trace_panel(run_started_ns)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file